@@ -14,7 +14,7 @@ from typing import Dict, List, Optional
 import urllib.request
 
 sys.path.insert(0, str(Path(__file__).parent))
-from utils import get_pipeline_dir, load_config, log_operation, get_anthropic_api_key
+from utils import add_to_approved_index, get_pipeline_dir, load_config, log_operation, get_anthropic_api_key
 
 
 class BreakingNews:
@@ -361,6 +361,7 @@ Return ONLY the JSON object."""
         
         with open(approved_date_dir / "script.json", 'w') as f:
             json.dump(approved_record, f, indent=2)
+        add_to_approved_index(approved_date_dir.parent, approved_date_dir.name)
         
         # Save markdown
         md_content = f"# ⚡ Auto-Approved Breaking News\n\n"
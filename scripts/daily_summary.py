@@ -14,7 +14,7 @@ from typing import Dict, List, Optional
 import urllib.request
 
 sys.path.insert(0, str(Path(__file__).parent))
-from utils import get_pipeline_dir, load_config, log_operation
+from utils import get_pipeline_dir, load_config, load_operation_log, log_operation
 from cost_tracker import CostTracker
 
 
@@ -141,13 +141,7 @@ class DailySummary:
     
     def load_pipeline_logs(self, date_str: str) -> List[Dict]:
         """Load pipeline logs for date."""
-        log_file = self.logs_dir / f"{date_str}.json"
-        
-        if not log_file.exists():
-            return []
-        
-        with open(log_file) as f:
-            return json.load(f)
+        return load_operation_log(date_str)
     
     def generate_summary(self, date_str: Optional[str] = None) -> Dict:
         """Generate complete daily summary."""
@@ -17,14 +17,16 @@ import re
 import sys
 import urllib.request
 import urllib.error
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+from functools import cached_property
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
 
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
-from utils import get_pipeline_dir, load_config, log_operation
+from utils import get_pipeline_dir, json_loads, load_config, load_records, log_operation
 
 # Setup logging
 logging.basicConfig(
@@ -103,28 +105,38 @@ class RetentionWatcher:
         self.templates_dir.mkdir(exist_ok=True)
         self.uploads_dir = self.pipeline_dir / "uploads"
         
-        # Load credentials
+        # Credentials are read from TOKEN_PATH on first API use
         self.credentials = None
-        self.access_token = None
-        self._load_credentials()
     
-    def _load_credentials(self) -> None:
-        """Load OAuth credentials from token file."""
+    @cached_property
+    def access_token(self) -> Optional[str]:
+        """OAuth access token, loaded lazily so offline paths skip the token file."""
+        return self._load_credentials()
+    
+    @cached_property
+    def _auth_headers(self) -> Dict[str, str]:
+        """Request headers, built once per token instead of on every API request."""
+        return {
+            'Authorization': f'Bearer {self.access_token}',
+            'Accept': 'application/json'
+        }
+    
+    def _load_credentials(self) -> Optional[str]:
+        """Load the OAuth access token from the token file."""
         if not self.TOKEN_PATH.exists():
             logger.warning(f"Token not found at {self.TOKEN_PATH}")
             logger.info("Run youtube_uploader.py first to authenticate")
-            return
+            return None
         
         try:
-            with open(self.TOKEN_PATH) as f:
-                token_data = json.load(f)
-                self.access_token = token_data.get('token')
-                if not self.access_token:
-                    # Try alternate format
-                    self.access_token = token_data.get('access_token')
-                logger.info("Loaded YouTube credentials")
+            with open(self.TOKEN_PATH, 'rb') as f:
+                token_data = json_loads(f.read())
+            logger.info("Loaded YouTube credentials")
+            # Try alternate format
+            return token_data.get('token') or token_data.get('access_token')
         except Exception as e:
             logger.error(f"Failed to load credentials: {e}")
+            return None
     
     def _make_api_request(self, url: str, headers: Optional[Dict] = None) -> Optional[Dict]:
         """Make authenticated API request."""
@@ -135,14 +147,12 @@ class RetentionWatcher:
         import urllib.request
         import urllib.error
         
-        request_headers = headers or {}
-        request_headers['Authorization'] = f'Bearer {self.access_token}'
-        request_headers['Accept'] = 'application/json'
+        request_headers = {**headers, **self._auth_headers} if headers else self._auth_headers
         
         try:
             req = urllib.request.Request(url, headers=request_headers)
             with urllib.request.urlopen(req, timeout=30) as response:
-                return json.loads(response.read().decode('utf-8'))
+                return json_loads(response.read())
         except urllib.error.HTTPError as e:
             error_body = e.read().decode('utf-8')
             logger.error(f"API error {e.code}: {error_body}")
@@ -345,20 +355,25 @@ class RetentionWatcher:
         """Perform full analysis on a single video."""
         logger.info(f"Analyzing video: {video_id}")
         
-        # Get video info
+        # Get video info (this also loads the token before the threads below)
         info = self.get_video_info(video_id)
         if not info:
             logger.error(f"Could not fetch video info for {video_id}")
             return None
         
+        # The two Analytics reports are independent round-trips; overlap them
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            analytics_future = pool.submit(self.get_video_analytics, video_id)
+            graph_future = pool.submit(self.get_retention_graph, video_id)
+        
         # Get analytics
-        analytics = self.get_video_analytics(video_id)
+        analytics = analytics_future.result()
         if not analytics:
             logger.warning(f"No analytics data for {video_id}")
             analytics = {}
         
         # Get retention graph
-        retention_graph = self.get_retention_graph(video_id)
+        retention_graph = graph_future.result()
         cliff_points = self.identify_cliff_points(retention_graph)
         
         # Calculate retention percentage
@@ -400,18 +415,15 @@ class RetentionWatcher:
     
     def load_uploads_for_date(self, date_str: str) -> List[Dict]:
         """Load upload records for a specific date."""
-        uploads_file = self.uploads_dir / f"{date_str}.json"
-        
-        if not uploads_file.exists():
-            logger.warning(f"No uploads found for {date_str}")
-            return []
-        
         try:
-            with open(uploads_file) as f:
-                return json.load(f)
+            uploads = load_records(self.uploads_dir / f"{date_str}.jsonl")
         except Exception as e:
             logger.error(f"Failed to load uploads: {e}")
             return []
+        
+        if not uploads:
+            logger.warning(f"No uploads found for {date_str}")
+        return uploads
     
     def check_date(self, date_str: str) -> Dict:
         """Check all videos from a specific date."""
@@ -602,16 +614,15 @@ class RetentionWatcher:
                     pass
         
         # Also check uploads directory for any videos not yet analyzed
-        for uploads_file in self.uploads_dir.glob("*.json"):
+        upload_days = {p.stem for pattern in ("*.jsonl", "*.json") for p in self.uploads_dir.glob(pattern)}
+        for day in sorted(upload_days):
             try:
-                with open(uploads_file) as f:
-                    uploads = json.load(f)
-                    for upload in uploads:
-                        video_id = upload.get('video_id')
-                        if video_id and not any(v['video_id'] == video_id for v in all_videos):
-                            metrics = self.check_video(video_id)
-                            if metrics:
-                                all_videos.append(self._metrics_to_dict(metrics))
+                for upload in load_records(self.uploads_dir / f"{day}.jsonl"):
+                    video_id = upload.get('video_id')
+                    if video_id and not any(v['video_id'] == video_id for v in all_videos):
+                        metrics = self.check_video(video_id)
+                        if metrics:
+                            all_videos.append(self._metrics_to_dict(metrics))
             except:
                 pass
         
@@ -4,17 +4,75 @@ TelegramBot - Inline button handler for script approvals
 ✅ Approve, ✏️ Edit, ❌ Kill, 🔄 Rewrite with callback handling
 """
 
+import asyncio
+import functools
+import html
+import itertools
 import json
 import os
+import socket
 import sys
 import subprocess
-from datetime import datetime, timezone
+import threading
+import time
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
+import urllib.parse
 import urllib.request
 
 sys.path.insert(0, str(Path(__file__).parent))
-from utils import get_pipeline_dir, load_config, log_operation
+from utils import atomic_write_text, get_pipeline_dir, json_dumps, json_loads, load_config, log_operation, utcnow_iso
+
+
+# Callback statuses that count as handled
+OK_STATUSES = ("success", "accepted", "pending", "awaiting_input")
+
+# Decision labels shown when a message is edited after a button press
+ACTION_LABELS = {
+    "approve": "✅ APPROVED",
+    "kill": "❌ KILLED",
+    "rewrite": "🔄 REWRITE QUEUED",
+}
+
+
+def get_socket_path() -> Path:
+    """Unix socket the --daemon mode listens on."""
+    return get_pipeline_dir() / "state" / "bot.sock"
+
+
+# How long a client waits for the daemon's reply. Must exceed the daemon's
+# worst case: an edit's sendMessage, then the concurrent answer/edit calls,
+# each bounded by a 30 s urlopen timeout.
+DAEMON_REPLY_TIMEOUT = 90
+
+
+def send_to_daemon(payload: Dict, timeout: float = DAEMON_REPLY_TIMEOUT) -> Optional[Dict]:
+    """Forward a callback to a running daemon.
+    
+    Returns None only when no daemon accepts the connection, so the caller can
+    handle the callback in-process. Once the request is sent the daemon may
+    already have applied it, so later failures come back as an error result.
+    """
+    socket_path = get_socket_path()
+    if not socket_path.exists():
+        return None
+    
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.settimeout(5)
+            sock.connect(str(socket_path))
+        except OSError as e:
+            print(f"[TelegramBot] Daemon unavailable, handling in-process: {e}")
+            return None
+        
+        try:
+            sock.settimeout(timeout)
+            sock.sendall(json.dumps(payload).encode('utf-8') + b"\n")
+            with sock.makefile('rb') as f:
+                return json.loads(f.readline())
+        except (OSError, ValueError) as e:
+            return {"status": "error", "message": f"No reply from daemon: {e}"}
 
 
 class TelegramBot:
@@ -28,12 +86,27 @@ class TelegramBot:
         self.state_dir = self.pipeline_dir / "state"
         self.state_dir.mkdir(exist_ok=True)
         
+        # Serializes state load/save when callbacks run concurrently (daemon mode)
+        self._state_lock = threading.Lock()
+        
+        # Approval pipelines still running; reaped on later callbacks so the
+        # long-running modes don't collect zombies
+        self._children: List[subprocess.Popen] = []
+        
         # Telegram config
         self.telegram_token = os.environ.get('TELEGRAM_BOT_TOKEN')
         self.telegram_chat_id = os.environ.get('TELEGRAM_CHAT_ID')
         
         if not self.telegram_token:
             print("[TelegramBot] Warning: TELEGRAM_BOT_TOKEN not set")
+        
+        # Bot API endpoints and headers, built once
+        self._api_base = f"https://api.telegram.org/bot{self.telegram_token}"
+        self._send_url = self._api_base + "/sendMessage"
+        self._answer_url = self._api_base + "/answerCallbackQuery"
+        self._edit_url = self._api_base + "/editMessageText"
+        self._updates_url = self._api_base + "/getUpdates"
+        self._json_headers = {"Content-Type": "application/json"}
     
     def get_state_file(self) -> Path:
         """Get state file for pending approvals."""
@@ -44,19 +117,29 @@ class TelegramBot:
         state_file = self.get_state_file()
         
         if state_file.exists():
-            with open(state_file) as f:
-                return json.load(f)
+            state = json_loads(state_file.read_bytes())
+            state.setdefault("editing", {})
+            
+            # Older state files kept decided scripts inside "pending"
+            for mid in [m for m, info in state["pending"].items() if info.get("status") != "pending"]:
+                info = state["pending"].pop(mid)
+                if info.get("status") == "awaiting_edit":
+                    state["editing"][mid] = info
+                else:
+                    state["history"].append({"message_id": mid, **info})
+            
+            return state
         
         return {
-            "pending": {},  # message_id -> script_info
+            "pending": {},  # message_id -> script_info (undecided only)
+            "editing": {},  # message_id -> script_info awaiting edit input
             "history": []   # approval history
         }
     
     def save_pending_approvals(self, state: Dict):
         """Save pending approvals state."""
         state_file = self.get_state_file()
-        with open(state_file, 'w') as f:
-            json.dump(state, f, indent=2)
+        atomic_write_text(state_file, json_dumps(state, indent=True))
     
     def register_script(self, message_id: str, script: Dict, date_str: str, index: int):
         """Register a script for approval tracking."""
@@ -66,14 +149,33 @@ class TelegramBot:
             "script": script,
             "date": date_str,
             "index": index,
-            "registered_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "registered_at": utcnow_iso(),
             "status": "pending"
         }
         
         self.save_pending_approvals(state)
         print(f"[TelegramBot] Registered script {index} for approval (msg: {message_id})")
     
-    def build_inline_keyboard(self, script_index: int) -> Dict:
+    def register_batch(self, message_id: str, scripts: List[Dict], date_str: str):
+        """Register every script of a batch message, keyed by "<message_id>:<index>"."""
+        state = self.load_pending_approvals()
+        registered_at = utcnow_iso()
+        
+        for index, script in enumerate(scripts, 1):
+            state["pending"][f"{message_id}:{index}"] = {
+                "script": script,
+                "date": date_str,
+                "index": index,
+                "batch_size": len(scripts),
+                "registered_at": registered_at,
+                "status": "pending"
+            }
+        
+        self.save_pending_approvals(state)
+        print(f"[TelegramBot] Registered {len(scripts)} scripts for approval (msg: {message_id})")
+    
+    @staticmethod
+    def build_inline_keyboard(script_index: int) -> Dict:
         """Build inline keyboard with approval buttons."""
         return {
             "inline_keyboard": [
@@ -88,45 +190,69 @@ class TelegramBot:
             ]
         }
     
-    def send_script_with_buttons(self, script: Dict, date_str: str, index: int) -> Optional[str]:
-        """Send script to Telegram with inline approval buttons."""
-        if not self.telegram_token or not self.telegram_chat_id:
-            print("[TelegramBot] Telegram not configured")
-            return None
-        
-        # Format message
-        lines = [
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _keyboard_json(script_index: int) -> str:
+        """Serialized inline keyboard for a script index (Telegram accepts a JSON string)."""
+        return json.dumps(TelegramBot.build_inline_keyboard(script_index))
+    
+    @staticmethod
+    def _selector_row(batch_size: int) -> List[Dict]:
+        """Row of script-number buttons that page through a batch message."""
+        return [{"text": str(i), "callback_data": f"show:{i}"} for i in range(1, batch_size + 1)]
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
+    def _batch_keyboard_json(script_index: int, batch_size: int) -> str:
+        """Serialized keyboard for a batch message: selectors, plus approval buttons once a script is shown."""
+        rows = TelegramBot.build_inline_keyboard(script_index)["inline_keyboard"] if script_index else []
+        return json.dumps({"inline_keyboard": rows + [TelegramBot._selector_row(batch_size)]})
+    
+    def _format_script(self, script: Dict, index: int) -> str:
+        """Format a script for Telegram, stopping at whole lines before the length limit."""
+        header = [
             f"📝 <b>SCRIPT {index}</b> [{script['variation']}]",
-            f"<i>{script['headline'][:60]}...</i>",
+            f"<i>{html.escape(script['headline'][:60])}...</i>",
             f"",
             f"📊 {script['word_count']}w | ~{script['duration_sec']}s | Grade {script['grade_level']}",
-            f"🎭 Tone: {script['tone']} | Hook: {script['hook_strength']}/10",
+            f"🎭 Tone: {html.escape(script['tone'])} | Hook: {script['hook_strength']}/10",
             f""
         ]
+        body = (f"{j}. {html.escape(line)}" for j, line in enumerate(script['lines'], 1))
         
-        for j, line in enumerate(script['lines'], 1):
-            lines.append(f"{j}. {line}")
+        lines = []
+        total = 0
+        for piece in itertools.chain(header, body):
+            total += len(piece) + 1
+            if total > 4000:
+                break
+            lines.append(piece)
         
-        message = '\n'.join(lines)
+        return '\n'.join(lines)
+    
+    def send_script_with_buttons(self, script: Dict, date_str: str, index: int) -> Optional[str]:
+        """Send script to Telegram with inline approval buttons."""
+        if not self.telegram_token or not self.telegram_chat_id:
+            print("[TelegramBot] Telegram not configured")
+            return None
         
-        # Build keyboard
-        keyboard = self.build_inline_keyboard(index)
+        message = self._format_script(script, index)
         
         # Send message
-        url = f"https://api.telegram.org/bot{self.telegram_token}/sendMessage"
+        url = self._send_url
         
         data = {
             "chat_id": self.telegram_chat_id,
-            "text": message[:4000],
+            "text": message,
             "parse_mode": "HTML",
-            "reply_markup": keyboard
+            "reply_markup": self._keyboard_json(index)
         }
         
         try:
             req = urllib.request.Request(
                 url,
                 data=json.dumps(data).encode('utf-8'),
-                headers={"Content-Type": "application/json"},
+                headers=self._json_headers,
                 method='POST'
             )
             
@@ -145,8 +271,54 @@ class TelegramBot:
             print(f"[TelegramBot] Send error: {e}")
             return None
     
+    def send_script_batch(self, scripts: List[Dict], date_str: str) -> Optional[str]:
+        """Send several scripts as one message that pages between them via show:N buttons."""
+        if not self.telegram_token or not self.telegram_chat_id:
+            print("[TelegramBot] Telegram not configured")
+            return None
+        
+        lines = [f"📝 <b>{len(scripts)} SCRIPTS</b> for {date_str}", ""]
+        for i, script in enumerate(scripts, 1):
+            lines.append(f"{i}. [{script['variation']}] {html.escape(script['headline'][:60])}... "
+                         f"(Hook {script['hook_strength']}/10)")
+        lines.extend(["", "Tap a number to review and approve."])
+        
+        data = {
+            "chat_id": self.telegram_chat_id,
+            "text": '\n'.join(lines)[:4000],
+            "parse_mode": "HTML",
+            "reply_markup": self._batch_keyboard_json(0, len(scripts))
+        }
+        
+        try:
+            req = urllib.request.Request(
+                self._send_url,
+                data=json.dumps(data).encode('utf-8'),
+                headers=self._json_headers,
+                method='POST'
+            )
+            
+            with urllib.request.urlopen(req, timeout=30) as response:
+                result = json.loads(response.read().decode('utf-8'))
+                if result.get('ok'):
+                    message_id = str(result['result']['message_id'])
+                    self.register_batch(message_id, scripts, date_str)
+                    print(f"[TelegramBot] Batch of {len(scripts)} scripts sent (msg: {message_id})")
+                    return message_id
+                else:
+                    print(f"[TelegramBot] Send error: {result}")
+                    return None
+        except Exception as e:
+            print(f"[TelegramBot] Send error: {e}")
+            return None
+    
     def handle_callback(self, callback_data: str, message_id: str) -> Dict:
         """Handle inline button callback."""
+        with self._state_lock:
+            self._children = [p for p in self._children if p.poll() is None]
+            return self._handle_callback(callback_data, message_id)
+    
+    def _handle_callback(self, callback_data: str, message_id: str) -> Dict:
         print(f"[TelegramBot] Handling callback: {callback_data} for msg {message_id}")
         
         # Parse callback data
@@ -156,9 +328,12 @@ class TelegramBot:
         
         action, script_index = parts[0], int(parts[1])
         
-        # Load pending state
+        # Load pending state; batch messages track scripts as "<message_id>:<index>"
         state = self.load_pending_approvals()
-        pending = state["pending"].get(message_id)
+        key = f"{message_id}:{script_index}"
+        if key not in state["pending"] and key not in state["editing"]:
+            key = message_id
+        pending = state["pending"].get(key) or state["editing"].get(key)
         
         if not pending:
             return {"status": "error", "message": "Script not found or already processed"}
@@ -166,6 +341,16 @@ class TelegramBot:
         script = pending["script"]
         date_str = pending["date"]
         
+        if action == "show":
+            return {
+                "action": "show",
+                "status": "success",
+                "script_index": script_index,
+                "batch_size": pending.get("batch_size", 1),
+                "text": self._format_script(script, script_index),
+                "message": f"Script {script_index}"
+            }
+        
         result = {
             "action": action,
             "script_index": script_index,
@@ -174,44 +359,131 @@ class TelegramBot:
         }
         
         if action == "approve":
-            result = self._handle_approve(script, date_str, message_id, state)
+            result = self._handle_approve(script, date_str, key, state)
         elif action == "kill":
-            result = self._handle_kill(script, message_id, state)
+            result = self._handle_kill(script, key, state)
         elif action == "edit":
-            result = self._handle_edit(script, message_id, state)
+            result = self._handle_edit(script, key, state)
         elif action == "rewrite":
-            result = self._handle_rewrite(script, date_str, message_id, state)
+            result = self._handle_rewrite(script, date_str, key, state)
+        else:
+            return result
+        
+        if "batch_size" in pending:
+            result["script_index"] = script_index
+            result["batch_size"] = pending["batch_size"]
+        
+        # Handlers only mutate the loaded state; persist it once
+        self.save_pending_approvals(state)
+        
+        return result
+    
+    async def handle_callback_async(self, callback_data: str, message_id: str,
+                                    callback_query_id: Optional[str] = None) -> Dict:
+        """Handle callback, then answer it and update the message concurrently.
+        
+        answerCallbackQuery and editMessageText are independent, so both are
+        fired together instead of paying one Telegram round-trip each.
+        """
+        result = await asyncio.to_thread(self.handle_callback, callback_data, message_id)
+        
+        calls = []
+        if callback_query_id:
+            calls.append(asyncio.to_thread(self.answer_callback, callback_query_id, result.get("message")))
+        
+        label = ACTION_LABELS.get(result.get("action"))
+        batch_size = result.get("batch_size")
+        if result.get("action") == "show" and result.get("status") == "success":
+            keyboard = self._batch_keyboard_json(result["script_index"], batch_size)
+            calls.append(asyncio.to_thread(self.update_message, message_id, result["text"], reply_markup=keyboard))
+        elif label and result.get("status") in ("success", "accepted", "pending"):
+            new_text = f"<b>{label}</b>\n{html.escape(result.get('message', ''))}"
+            # Batch messages keep their selectors so the other scripts stay reachable
+            keyboard = self._batch_keyboard_json(0, batch_size) if batch_size else None
+            calls.append(asyncio.to_thread(self.update_message, message_id, new_text, reply_markup=keyboard))
+        
+        if calls:
+            await asyncio.gather(*calls)
         
         return result
     
+    def _archive(self, state: Dict, message_id: str, action: str, status: str, script: Dict) -> Dict:
+        """Move a decided script out of pending/editing into history."""
+        entry = state["pending"].pop(message_id, None) or state["editing"].pop(message_id, {})
+        entry["status"] = status
+        
+        record = {
+            "action": action,
+            "script_id": script.get('seed_id'),
+            "timestamp": utcnow_iso(),
+            "message_id": message_id,
+            **entry
+        }
+        state["history"].append(record)
+        return record
+    
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Handle one daemon client: a single JSON request line, a single JSON reply line."""
+        try:
+            try:
+                request = json.loads(await reader.readline())
+                callback = (request["callback_data"], str(request["message_id"]),
+                            request.get("callback_query_id"))
+            except (ValueError, KeyError, TypeError) as e:
+                result = {"status": "error", "message": f"Bad daemon request: {e}"}
+            else:
+                try:
+                    result = await self.handle_callback_async(*callback)
+                except Exception as e:
+                    # Always reply, so the client never re-runs the callback itself
+                    print(f"[TelegramBot] Callback {callback[0]!r} failed: {e}")
+                    result = {"status": "error", "message": f"Callback failed: {e}"}
+            
+            writer.write(json.dumps(result).encode('utf-8') + b"\n")
+            await writer.drain()
+        finally:
+            writer.close()
+    
+    async def serve(self):
+        """Run as a daemon, dispatching callbacks received on the Unix socket."""
+        socket_path = get_socket_path()
+        if socket_path.exists():
+            socket_path.unlink()
+        
+        server = await asyncio.start_unix_server(self._serve_client, path=str(socket_path))
+        print(f"[TelegramBot] Daemon listening on {socket_path}")
+        
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if socket_path.exists():
+                socket_path.unlink()
+    
     def _handle_approve(self, script: Dict, date_str: str, message_id: str, state: Dict) -> Dict:
         """Handle ✅ Approve action."""
         print(f"[TelegramBot] Approving script: {script['headline'][:40]}...")
         
         # Update state
-        state["pending"][message_id]["status"] = "approved"
-        state["history"].append({
-            "action": "approve",
-            "script_id": script.get('seed_id'),
-            "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-        })
-        self.save_pending_approvals(state)
+        record = self._archive(state, message_id, "approve", "approved", script)
         
-        # Trigger approval in DramaMaestro
+        # Trigger approval in DramaMaestro without blocking the callback
         try:
-            result = subprocess.run(
+            proc = subprocess.Popen(
                 [sys.executable, str(self.pipeline_dir / "scripts" / "drama_maestro.py"),
                  "--approve-script", script.get('seed_id', ''), "--date", date_str],
-                capture_output=True, text=True, timeout=300
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                start_new_session=True
             )
-            
-            success = result.returncode == 0
+            record["approve_pid"] = proc.pid
+            self._children.append(proc)
             
             return {
                 "action": "approve",
-                "status": "success" if success else "failed",
+                "status": "accepted",
                 "script_id": script.get('seed_id'),
-                "message": "Script approved and pipeline triggered" if success else "Approval failed"
+                "pid": proc.pid,
+                "message": "Script approved - pipeline started"
             }
         except Exception as e:
             return {
@@ -225,13 +497,7 @@ class TelegramBot:
         print(f"[TelegramBot] Killing script: {script['headline'][:40]}...")
         
         # Update state
-        state["pending"][message_id]["status"] = "killed"
-        state["history"].append({
-            "action": "kill",
-            "script_id": script.get('seed_id'),
-            "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-        })
-        self.save_pending_approvals(state)
+        self._archive(state, message_id, "kill", "killed", script)
         
         return {
             "action": "kill",
@@ -245,12 +511,13 @@ class TelegramBot:
         print(f"[TelegramBot] Edit requested for script: {script['headline'][:40]}...")
         
         # Update state to mark as awaiting edit
-        state["pending"][message_id]["status"] = "awaiting_edit"
-        state["pending"][message_id]["edit_requested_at"] = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-        self.save_pending_approvals(state)
+        entry = state["pending"].pop(message_id, None) or state["editing"][message_id]
+        entry["status"] = "awaiting_edit"
+        entry["edit_requested_at"] = utcnow_iso()
+        state["editing"][message_id] = entry
         
-        # Send edit instructions
-        self._send_edit_instructions(message_id, script)
+        # Send edit instructions (batch keys are "<message_id>:<index>")
+        self._send_edit_instructions(message_id.split(":")[0], script)
         
         return {
             "action": "edit",
@@ -278,7 +545,7 @@ class TelegramBot:
         
         message = '\n'.join(lines)
         
-        url = f"https://api.telegram.org/bot{self.telegram_token}/sendMessage"
+        url = self._send_url
         
         data = {
             "chat_id": self.telegram_chat_id,
@@ -291,7 +558,7 @@ class TelegramBot:
             req = urllib.request.Request(
                 url,
                 data=json.dumps(data).encode('utf-8'),
-                headers={"Content-Type": "application/json"},
+                headers=self._json_headers,
                 method='POST'
             )
             
@@ -307,13 +574,7 @@ class TelegramBot:
         print(f"[TelegramBot] Rewrite requested for script: {script['headline'][:40]}...")
         
         # Update state
-        state["pending"][message_id]["status"] = "rewriting"
-        state["history"].append({
-            "action": "rewrite",
-            "script_id": script.get('seed_id'),
-            "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-        })
-        self.save_pending_approvals(state)
+        self._archive(state, message_id, "rewrite", "rewriting", script)
         
         # Trigger rewrite via ScriptSmith
         try:
@@ -337,7 +598,7 @@ class TelegramBot:
         if not self.telegram_token:
             return
         
-        url = f"https://api.telegram.org/bot{self.telegram_token}/answerCallbackQuery"
+        url = self._answer_url
         
         data = {
             "callback_query_id": callback_query_id
@@ -350,7 +611,7 @@ class TelegramBot:
             req = urllib.request.Request(
                 url,
                 data=json.dumps(data).encode('utf-8'),
-                headers={"Content-Type": "application/json"},
+                headers=self._json_headers,
                 method='POST'
             )
             
@@ -361,12 +622,13 @@ class TelegramBot:
             print(f"[TelegramBot] Answer callback error: {e}")
             return False
     
-    def update_message(self, message_id: str, new_text: str, parse_mode: str = "HTML"):
+    def update_message(self, message_id: str, new_text: str, parse_mode: str = "HTML",
+                       reply_markup: Optional[str] = None):
         """Update message text after action."""
         if not self.telegram_token or not self.telegram_chat_id:
             return
         
-        url = f"https://api.telegram.org/bot{self.telegram_token}/editMessageText"
+        url = self._edit_url
         
         data = {
             "chat_id": self.telegram_chat_id,
@@ -375,11 +637,14 @@ class TelegramBot:
             "parse_mode": parse_mode
         }
         
+        if reply_markup:
+            data["reply_markup"] = reply_markup
+        
         try:
             req = urllib.request.Request(
                 url,
                 data=json.dumps(data).encode('utf-8'),
-                headers={"Content-Type": "application/json"},
+                headers=self._json_headers,
                 method='POST'
             )
             
@@ -390,19 +655,64 @@ class TelegramBot:
             print(f"[TelegramBot] Update message error: {e}")
             return False
     
+    def poll_updates(self, poll_timeout: int = 25):
+        """Long-poll getUpdates and dispatch button presses until interrupted.
+        
+        Telegram holds each request open for up to poll_timeout seconds, so an
+        idle bot makes ~2 requests a minute while still reacting immediately.
+        """
+        if not self.telegram_token or not self.telegram_chat_id:
+            print("[TelegramBot] Telegram not configured")
+            return
+        
+        print(f"[TelegramBot] Long-polling for callbacks (timeout={poll_timeout}s)")
+        offset = None
+        
+        while True:
+            params = {"timeout": poll_timeout, "allowed_updates": '["callback_query"]'}
+            if offset is not None:
+                params["offset"] = offset
+            
+            try:
+                url = f"{self._updates_url}?{urllib.parse.urlencode(params)}"
+                with urllib.request.urlopen(url, timeout=poll_timeout + 5) as response:
+                    result = json.loads(response.read().decode('utf-8'))
+            except Exception as e:
+                print(f"[TelegramBot] getUpdates error: {e}")
+                time.sleep(5)
+                continue
+            
+            for update in result.get("result", []):
+                # Advance first: the next getUpdates confirms this update even if
+                # handling it fails, so a bad update is never redelivered
+                offset = update["update_id"] + 1
+                query = update.get("callback_query")
+                if not query or "message" not in query:
+                    continue
+                
+                # Only act on buttons pressed in the configured chat
+                message = query["message"]
+                if str(message.get("chat", {}).get("id")) != str(self.telegram_chat_id):
+                    continue
+                
+                try:
+                    asyncio.run(self.handle_callback_async(
+                        query.get("data", ""), str(message["message_id"]), query["id"]
+                    ))
+                except Exception as e:
+                    # One bad update must not stop the poller
+                    print(f"[TelegramBot] Update {update['update_id']} failed "
+                          f"(callback data {query.get('data')!r}): {e}")
+    
     def get_pending_count(self) -> int:
         """Get count of pending approvals."""
         state = self.load_pending_approvals()
-        return len([s for s in state["pending"].values() if s["status"] == "pending"])
+        return len(state["pending"])
     
     def list_pending(self) -> List[Dict]:
         """List all pending approvals."""
         state = self.load_pending_approvals()
-        return [
-            {"message_id": mid, **info}
-            for mid, info in state["pending"].items()
-            if info["status"] == "pending"
-        ]
+        return [{"message_id": mid, **info} for mid, info in state["pending"].items()]
 
 
 def main():
@@ -416,11 +726,48 @@ def main():
     parser.add_argument('--callback-query-id', help='Callback query ID to answer')
     parser.add_argument('--pending-count', action='store_true', help='Show pending approval count')
     parser.add_argument('--list-pending', action='store_true', help='List pending approvals')
+    parser.add_argument('--daemon', action='store_true', help='Serve callbacks over a Unix socket (state/bot.sock)')
+    parser.add_argument('--poll-updates', action='store_true', help='Long-poll Telegram for button presses and handle them')
     
     args = parser.parse_args()
     
+    callback = None
+    if args.handle_callback:
+        # Parse callback data: action:index:message_id
+        parts = args.handle_callback.split(":")
+        if len(parts) != 3:
+            print("Error: callback format should be action:index:message_id")
+            return 1
+        
+        action, index, message_id = parts[0], int(parts[1]), parts[2]
+        callback = {
+            "callback_data": f"{action}:{index}",
+            "message_id": message_id,
+            "callback_query_id": args.callback_query_id
+        }
+        
+        # Hand off to a running daemon to skip bot startup entirely
+        result = send_to_daemon(callback)
+        if result is not None:
+            print(json.dumps(result, indent=2))
+            return 0 if result.get("status") in OK_STATUSES else 1
+    
     bot = TelegramBot()
     
+    if args.poll_updates:
+        try:
+            bot.poll_updates()
+        except KeyboardInterrupt:
+            pass
+        return 0
+    
+    if args.daemon:
+        try:
+            asyncio.run(bot.serve())
+        except KeyboardInterrupt:
+            pass
+        return 0
+    
     if args.pending_count:
         count = bot.get_pending_count()
         print(f"Pending approvals: {count}")
@@ -433,24 +780,13 @@ def main():
             print(f"  - {p['message_id']}: Script {p['index']} ({p['script']['headline'][:40]}...)")
         return 0
     
-    if args.handle_callback:
-        # Parse callback data: action:index:message_id
-        parts = args.handle_callback.split(":")
-        if len(parts) != 3:
-            print("Error: callback format should be action:index:message_id")
-            return 1
-        
-        action, index, message_id = parts[0], int(parts[1]), parts[2]
-        callback_data = f"{action}:{index}"
-        
-        result = bot.handle_callback(callback_data, message_id)
+    if callback:
+        result = asyncio.run(bot.handle_callback_async(
+            callback["callback_data"], callback["message_id"], callback["callback_query_id"]
+        ))
         print(json.dumps(result, indent=2))
         
-        # Answer callback if ID provided
-        if args.callback_query_id:
-            bot.answer_callback(args.callback_query_id, result.get("message"))
-        
-        return 0 if result["status"] in ["success", "pending", "awaiting_input"] else 1
+        return 0 if result["status"] in OK_STATUSES else 1
     
     if args.send_scripts:
         date_str = args.date or datetime.now().strftime("%Y-%m-%d")
@@ -467,15 +803,19 @@ def main():
         scripts = [s for s in data.get('scripts', []) if s.get('quality_passed')]
         scripts.sort(key=lambda x: x.get('hook_strength', 0), reverse=True)
         
-        # Send top 5 with buttons
-        for i, script in enumerate(scripts[:5], 1):
-            msg_id = bot.send_script_with_buttons(script, date_str, i)
-            if not msg_id:
-                print(f"Failed to send script {i}")
+        if not scripts:
+            print(f"No passing scripts for {date_str}")
+            return 0
+        
+        # Send top 5 as one paginated message
+        msg_id = bot.send_script_batch(scripts[:5], date_str)
+        if not msg_id:
+            print("Failed to send scripts")
+            return 1
         
         return 0
     
-    print("Use --send-scripts, --handle-callback, --pending-count, or --list-pending")
+    print("Use --send-scripts, --handle-callback, --poll-updates, --daemon, --pending-count, or --list-pending")
     return 0
 
 
@@ -3,29 +3,51 @@ Drama Pipeline Utilities
 Shared functions for Drive I/O, readability, logging
 """
 
+import copy
+import functools
 import json
 import os
 import re
 import subprocess
-from datetime import datetime, timezone
+import time
+from datetime import datetime
 from pathlib import Path
 
+# Optional fast JSON backend (falls back to stdlib json)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def utcnow_iso():
+    """Current UTC time as ISO 8601 with microseconds and a Z suffix."""
+    seconds, nanos = divmod(time.time_ns(), 1_000_000_000)
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds)) + f'.{nanos // 1000:06d}Z'
+
 
 def get_pipeline_dir():
     """Get the pipeline root directory."""
     return Path(__file__).resolve().parent.parent
 
 
-def load_config():
-    """Load configuration from config.yaml or env vars."""
+@functools.lru_cache(maxsize=1)
+def _load_config_raw():
+    """Read and parse config.yaml once per process."""
     import yaml
     
     config_path = get_pipeline_dir() / "config.yaml"
     
-    config = {}
     if config_path.exists():
         with open(config_path) as f:
-            config = yaml.safe_load(f) or {}
+            return yaml.safe_load(f) or {}
+    return {}
+
+
+def load_config():
+    """Load configuration from config.yaml or env vars."""
+    # Copy so callers can't mutate the cached parse
+    config = copy.deepcopy(_load_config_raw())
     
     # Resolve env var placeholders
     if 'x_api' in config and isinstance(config['x_api'], dict):
@@ -80,23 +102,72 @@ def drive_download(file_id, local_path, account="admin@renderwise.net"):
         return False
 
 
+# --- JSON I/O ---
+
+def json_loads(data):
+    """Parse JSON from str or bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj, indent=False):
+    """Serialize obj to a JSON string, using orjson when available."""
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(obj, option=option).decode('utf-8')
+    if indent:
+        return json.dumps(obj, indent=2)
+    return json.dumps(obj, separators=(',', ':'))
+
+
+def atomic_write_text(path, text, mode=0o666):
+    """Write text to path via a temp file and os.replace, so readers never see a partial file.
+    
+    The temp file is created with mode (less the umask), so a secret written with
+    mode=0o600 is never readable by others, even briefly.
+    """
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_CLOEXEC', 0), mode)
+    with open(fd, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def add_to_approved_index(approved_date_dir, script_id):
+    """Record an approved script subdirectory in approved/<date>/index.json (creation order)."""
+    index_file = Path(approved_date_dir) / "index.json"
+    
+    index = {"scripts": []}
+    if index_file.exists():
+        try:
+            index = json.loads(index_file.read_text())
+        except json.JSONDecodeError:
+            pass
+    
+    if script_id not in index["scripts"]:
+        index["scripts"].append(script_id)
+        atomic_write_text(index_file, json.dumps(index, indent=2))
+
+
 # --- Readability Engine ---
 
+_VOWEL_GROUPS = re.compile(r'[aeiouy]+')
+_SENTENCE_SPLIT = re.compile(r'[.!?]+')
+_HAS_ALPHA = re.compile(r'[a-zA-Z]')
+_WORD_STRIP_CHARS = ".,!?;:'\"()-"
+
+
 def count_syllables(word):
     """Estimate syllable count for English word."""
-    word = word.lower().strip(".,!?;:'\"()-")
+    word = word.lower().strip(_WORD_STRIP_CHARS)
     if not word:
         return 0
     
-    count = 0
-    vowels = "aeiouy"
-    prev_vowel = False
-    
-    for char in word:
-        is_vowel = char in vowels
-        if is_vowel and not prev_vowel:
-            count += 1
-        prev_vowel = is_vowel
+    count = len(_VOWEL_GROUPS.findall(word))
     
     if word.endswith("e") and count > 1:
         count -= 1
@@ -106,15 +177,14 @@ def count_syllables(word):
 
 def flesch_kincaid_grade(text):
     """Calculate Flesch-Kincaid Grade Level."""
-    sentences = re.split(r'[.!?]+', text)
-    sentences = [s.strip() for s in sentences if s.strip()]
-    words = [w for w in text.split() if re.search(r'[a-zA-Z]', w)]
+    sentence_count = sum(1 for s in _SENTENCE_SPLIT.split(text) if s.strip())
+    words = [w for w in text.split() if _HAS_ALPHA.search(w)]
     
-    if not sentences or not words:
+    if not sentence_count or not words:
         return 0
     
     total_syllables = sum(count_syllables(w) for w in words)
-    grade = 0.39 * (len(words) / len(sentences)) + 11.8 * (total_syllables / len(words)) - 15.59
+    grade = 0.39 * (len(words) / sentence_count) + 11.8 * (total_syllables / len(words)) - 15.59
     return round(grade, 1)
 
 
@@ -129,7 +199,7 @@ def estimate_duration(text, wpm=170):
 def log_operation(module, action, status, details=None):
     """Log pipeline operation."""
     log_entry = {
-        "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "timestamp": utcnow_iso(),
         "module": module,
         "action": action,
         "status": status,
@@ -137,25 +207,53 @@ def log_operation(module, action, status, details=None):
     }
     
     date = datetime.now().strftime("%Y-%m-%d")
-    log_file = get_pipeline_dir() / "logs" / f"{date}.json"
-    
-    logs = []
-    if log_file.exists():
-        try:
-            with open(log_file) as f:
-                logs = json.load(f)
-        except:
-            pass
-    
-    logs.append(log_entry)
+    log_file = get_pipeline_dir() / "logs" / f"{date}.jsonl"
     
+    # Append-only JSON Lines: one entry per line, no read-modify-write
     log_file.parent.mkdir(parents=True, exist_ok=True)
-    with open(log_file, 'w') as f:
-        json.dump(logs, f, indent=2)
+    with open(log_file, 'a', encoding='utf-8') as f:
+        f.write(json_dumps(log_entry) + '\n')
     
     return log_entry
 
 
+def load_records(path):
+    """Load records from a JSON Lines file.
+    
+    Reads `<path>.jsonl`, falling back to the legacy single-array `.json`
+    file with the same stem for older dates.
+    """
+    path = Path(path)
+    jsonl_path = path.with_suffix('.jsonl')
+    if jsonl_path.exists():
+        records = []
+        with open(jsonl_path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json_loads(line))
+                except json.JSONDecodeError:
+                    pass  # Skip a torn trailing line
+        return records
+    
+    legacy_path = path.with_suffix('.json')
+    if legacy_path.exists():
+        try:
+            with open(legacy_path) as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            pass
+    
+    return []
+
+
+def load_operation_log(date_str):
+    """Load pipeline operation log entries for a date (see load_records)."""
+    return load_records(get_pipeline_dir() / "logs" / f"{date_str}.jsonl")
+
+
 # --- API Key Resolution ---
 
 def get_anthropic_api_key():
@@ -165,14 +263,20 @@ def get_anthropic_api_key():
     if key:
         return key
     
-    # File-based
-    key_paths = [
-        Path.home() / ".openclaw/credentials/anthropic-api-key",
-        Path.home() / ".config/env/anthropic-key",
+    # File-based: one directory read per location instead of a stat per file
+    key_locations = [
+        (Path.home() / ".openclaw/credentials", "anthropic-api-key"),
+        (Path.home() / ".config/env", "anthropic-key"),
     ]
-    for p in key_paths:
-        if p.exists():
-            content = p.read_text().strip()
+    for key_dir, key_name in key_locations:
+        try:
+            with os.scandir(key_dir) as it:
+                entry = next((e for e in it if e.name == key_name), None)
+        except OSError:
+            continue
+        # is_file() follows symlinks, so a dangling key-file link is skipped
+        if entry is not None and entry.is_file():
+            content = Path(entry.path).read_text().strip()
             if content:  # Only return if file has content
                 return content
     
@@ -180,7 +284,7 @@ def get_anthropic_api_key():
     config_path = Path.home() / ".openclaw/openclaw.json"
     if config_path.exists():
         try:
-            config = json.loads(config_path.read_text())
+            config = json_loads(config_path.read_bytes())
             key = (config.get("models", {}).get("providers", {}).get("anthropic", {}).get("apiKey", "")
                    or config.get("providers", {}).get("anthropic", {}).get("apiKey", ""))
             if key:
@@ -4,17 +4,164 @@ VoiceForge - Voiceover Generation Module
 Generates sentence-by-sentence voiceover using Crayo AI
 """
 
+import asyncio
+import functools
 import json
 import os
 import sys
 import time
 import subprocess
-from datetime import datetime, timezone
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 
 sys.path.insert(0, str(Path(__file__).parent))
-from utils import get_pipeline_dir, log_operation
+from utils import get_pipeline_dir, json_dumps, json_loads, log_operation, utcnow_iso
+
+
+# Fixed ffprobe argv prefixes; only the file path varies per call
+_FFPROBE_STREAM_ARGS = ("ffprobe", "-v", "error", "-select_streams", "a:0",
+                        "-show_entries", "stream=codec_name,sample_rate,channels",
+                        "-of", "json")
+_FFPROBE_DURATION_ARGS = ("ffprobe", "-v", "error", "-show_entries", "format=duration",
+                          "-of", "default=noprint_wrappers=1:nokey=1")
+
+
+@functools.lru_cache(maxsize=128)
+def _probe_stream_params(path: str, size: int, mtime: float) -> Optional[tuple]:
+    """Return (codec, sample_rate, channels) of the first audio stream.
+    
+    size and mtime are only part of the cache key, so an edited file is re-probed.
+    """
+    cmd = [*_FFPROBE_STREAM_ARGS, path]
+    try:
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=10)
+        if result.returncode != 0:
+            return None
+        stream = (json.loads(result.stdout).get("streams") or [{}])[0]
+    except (OSError, subprocess.SubprocessError, ValueError):
+        return None
+    return (stream.get("codec_name"), stream.get("sample_rate"), stream.get("channels"))
+
+
+# MPEG audio header tables (Layer III only)
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def _mp3_duration(path: Path) -> Optional[float]:
+    """Read MP3 duration from the first frame's Xing/Info/VBRI header.
+    
+    Returns None when there is no such header, or anything else it can't
+    parse, so callers can use ffprobe instead of guessing from the bitrate.
+    """
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(10)
+            audio_start = 0
+            if head[:3] == b"ID3" and len(head) == 10:
+                # ID3v2 size is a 4-byte syncsafe integer, plus an optional footer
+                size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+                audio_start = 10 + size + (10 if head[5] & 0x10 else 0)
+            f.seek(audio_start)
+            buf = f.read(4096)
+    except OSError:
+        return None
+    
+    # Locate the first valid Layer III frame header
+    pos = buf.find(b"\xff")
+    while 0 <= pos <= len(buf) - 4:
+        b1, b2, b3 = buf[pos + 1], buf[pos + 2], buf[pos + 3]
+        version = (b1 >> 3) & 3
+        bitrate_idx, rate_idx = b2 >> 4, (b2 >> 2) & 3
+        if ((b1 & 0xE0) == 0xE0 and version != 1 and (b1 >> 1) & 3 == 1
+                and 0 < bitrate_idx < 15 and rate_idx < 3):
+            break
+        pos = buf.find(b"\xff", pos + 1)
+    else:
+        return None
+    
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_idx]
+    mono = (b3 >> 6) == 3
+    if version == 3:
+        samples_per_frame = 1152
+        side_info = 17 if mono else 32
+    else:
+        samples_per_frame = 576
+        side_info = 9 if mono else 17
+    
+    # Xing/Info header sits right after the side info (and the 2-byte CRC when
+    # the protection bit is clear); VBRI at a fixed offset
+    xing = pos + 4 + (0 if b1 & 1 else 2) + side_info
+    if len(buf) >= xing + 12 and buf[xing:xing + 4] in (b"Xing", b"Info") and buf[xing + 7] & 1:
+        frames = int.from_bytes(buf[xing + 8:xing + 12], 'big')
+        return frames * samples_per_frame / sample_rate
+    vbri = pos + 36
+    if buf[vbri:vbri + 4] == b"VBRI":
+        frames = int.from_bytes(buf[vbri + 14:vbri + 18], 'big')
+        return frames * samples_per_frame / sample_rate
+    
+    return None
+
+
+@functools.lru_cache(maxsize=128)
+def _probe_duration(path: str, size: int, mtime: float) -> float:
+    """Return audio duration in seconds via ffprobe (size/mtime only key the cache)."""
+    cmd = [*_FFPROBE_DURATION_ARGS, path]
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=10)
+    return float(result.stdout)
+
+
+def _audio_duration(path: Path) -> float:
+    """Return audio duration in seconds.
+    
+    MP3s are read from their frame header without spawning a process. Other
+    files (or unparseable MP3s) use ffprobe, reusing the <file>.probe.json
+    sidecar while the file is unchanged.
+    """
+    if path.suffix.lower() == ".mp3":
+        duration = _mp3_duration(path)
+        if duration:
+            return duration
+    
+    st = path.stat()
+    sidecar = path.with_name(path.name + ".probe.json")
+    
+    try:
+        cached = json.loads(sidecar.read_text())
+        if cached.get("size") == st.st_size and cached.get("mtime") == st.st_mtime:
+            return cached["duration_sec"]
+    except (OSError, ValueError, KeyError):
+        pass
+    
+    duration = _probe_duration(str(path), st.st_size, st.st_mtime)
+    sidecar.write_text(json.dumps({
+        "duration_sec": duration,
+        "size": st.st_size,
+        "mtime": st.st_mtime
+    }))
+    return duration
+
+
+def _dir_names(directory: Path) -> set:
+    """Names of the entries in directory from a single readdir (empty if missing)."""
+    try:
+        with os.scandir(directory) as it:
+            return {entry.name for entry in it}
+    except FileNotFoundError:
+        return set()
+
+
+def _segments_share_format(segment_files: List[Path]) -> bool:
+    """True if every segment is MP3 with the same sample rate and channel layout."""
+    params = set()
+    for seg in segment_files:
+        st = seg.stat()
+        params.add(_probe_stream_params(str(seg), st.st_size, st.st_mtime))
+    # Unprobeable segments (or no ffprobe) give None: re-encode to be safe
+    if len(params) != 1 or None in params:
+        return False
+    (codec, _, _), = params
+    return codec == "mp3"
 
 
 class VoiceForge:
@@ -29,7 +176,64 @@ class VoiceForge:
         # Voice settings
         self.voice_id = "DanDan"  # Default natural-sounding voice
         self.target_pace_wpm = 185  # Words per minute
+        self._sec_per_word = 60.0 / self.target_pace_wpm
         self.target_duration_range = (40, 55)  # seconds
+        
+        # Crayo browser automation (async Playwright); off until the automation lands
+        self.use_browser = False
+        self.max_concurrent_lines = 4
+        self.browser_state_file = self.pipeline_dir / ".playwright" / "state.json"
+        
+        # Shared browser, started lazily and kept for the life of the event loop
+        self._pw = None
+        self._browser = None
+        self._context = None
+        
+        # Set once per generate_voiceover run and shared by everything it writes
+        self._run_timestamp = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+    
+    async def _ensure_browser(self):
+        """Start the shared browser and logged-in context on first use.
+        
+        Returns None when use_browser is off.
+        """
+        if not self.use_browser:
+            return None
+        
+        if self._context is None:
+            from playwright.async_api import async_playwright
+            self._pw = await async_playwright().start()
+            self._browser = await self._pw.chromium.launch()
+            storage_state = str(self.browser_state_file) if self.browser_state_file.exists() else None
+            self._context = await self._browser.new_context(storage_state=storage_state)
+        
+        return self._context
+    
+    async def aclose(self):
+        """Persist the Crayo login and shut the shared browser down."""
+        if self._context is not None:
+            self.browser_state_file.parent.mkdir(parents=True, exist_ok=True)
+            await self._context.storage_state(path=str(self.browser_state_file))
+            await self._context.close()
+        if self._browser is not None:
+            await self._browser.close()
+        if self._pw is not None:
+            await self._pw.stop()
+        
+        self._pw = self._browser = self._context = None
+    
+    async def _run_then_close(self, coro):
+        """Await coro, then release the browser, which is bound to this event loop."""
+        try:
+            return await coro
+        finally:
+            await self.aclose()
     
     def load_approved_script(self, date_str: str, script_id: Optional[str] = None) -> Optional[Dict]:
         """Load approved script for voice generation."""
@@ -43,37 +247,80 @@ class VoiceForge:
         if script_id:
             script_file = approved_date_dir / script_id / "script.json"
             if script_file.exists():
-                with open(script_file) as f:
-                    return json.load(f)
+                return self._read_script(script_file)
         
         # Check for script.json directly in date dir
         script_file = approved_date_dir / "script.json"
         if script_file.exists():
-            with open(script_file) as f:
-                return json.load(f)
+            return self._read_script(script_file)
         
-        # Find first approved script in subdirs
-        for subdir in approved_date_dir.iterdir():
-            if subdir.is_dir():
-                script_file = subdir / "script.json"
+        # Use the approval index when present to avoid scanning subdirs
+        index_file = approved_date_dir / "index.json"
+        if index_file.exists():
+            try:
+                script_ids = json_loads(index_file.read_bytes()).get("scripts", [])
+            except json.JSONDecodeError:
+                script_ids = []
+            for indexed_id in script_ids:
+                script_file = approved_date_dir / indexed_id / "script.json"
                 if script_file.exists():
-                    with open(script_file) as f:
-                        return json.load(f)
+                    return self._read_script(script_file)
+        
+        # Find first approved script in subdirs
+        with os.scandir(approved_date_dir) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    script_file = Path(entry.path) / "script.json"
+                    if script_file.exists():
+                        return self._read_script(script_file)
         
         return None
     
+    def _read_script(self, script_file: Path) -> Dict:
+        """Read an approved script and count each line's words once."""
+        approved = json_loads(script_file.read_bytes())
+        
+        script = approved.setdefault('script', {})
+        script['_word_counts'] = [len(line.split()) for line in script.get('lines', [])]
+        return approved
+    
+    async def _generate_lines_async(self, numbered_lines: List[tuple], output_dir: Path) -> List[Optional[Path]]:
+        """Generate (line_num, line_text) pairs concurrently.
+        
+        All lines share the logged-in browser context; at most
+        max_concurrent_lines run at once.
+        """
+        ctx = await self._ensure_browser()
+        semaphore = asyncio.Semaphore(self.max_concurrent_lines)
+        
+        async def run_line(line_num: int, line_text: str) -> Optional[Path]:
+            async with semaphore:
+                return await self._generate_line_audio_async(ctx, line_text, line_num, output_dir)
+        
+        return list(await asyncio.gather(*(run_line(n, t) for n, t in numbered_lines)))
+    
     def generate_line_audio(self, line_text: str, line_num: int, output_dir: Path) -> Optional[Path]:
-        """Generate audio for a single line using Crayo AI.
+        """Generate audio for a single line (sync wrapper).
         
-        Note: Crayo AI has no public API. This uses browser automation
-        via Playwright or similar. For now, we create a placeholder
-        that documents what needs to be recorded.
+        Runs its own event loop, so call it only from synchronous code; async
+        callers should await _generate_lines_async instead.
         """
-        # Create segment directory
-        segments_dir = output_dir / "segments"
-        segments_dir.mkdir(exist_ok=True)
+        (output_dir / "segments").mkdir(exist_ok=True)
+        lines = [(line_num, line_text)]
+        return asyncio.run(self._run_then_close(self._generate_lines_async(lines, output_dir)))[0]
+    
+    async def _generate_line_audio_async(self, ctx, line_text: str, line_num: int,
+                                         output_dir: Path) -> Optional[Path]:
+        """Generate audio for a single line using Crayo AI in browser context ctx.
         
-        output_file = segments_dir / f"line-{line_num}.mp3"
+        Note: Crayo AI has no public API. This uses browser automation
+        via playwright.async_api only: sync Playwright objects are tied to
+        the greenlet of the thread that created them, and driving them from
+        worker threads fails with "greenlet.error: cannot switch to a
+        different thread". For now, we create a placeholder that documents
+        what needs to be recorded. Expects output_dir/segments to exist.
+        """
+        output_file = output_dir / "segments" / f"line-{line_num}.mp3"
         
         # Placeholder: In production, this would:
         # 1. Open Crayo AI in browser
@@ -82,56 +329,93 @@ class VoiceForge:
         # 4. Generate and download
         # 5. Save to output_file
         
-        # For now, create a metadata file indicating what needs recording
-        metadata = {
-            "line_number": line_num,
-            "text": line_text,
-            "voice": self.voice_id,
-            "status": "pending",
-            "target_duration_sec": len(line_text.split()) / (self.target_pace_wpm / 60),
-            "created_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-        }
+        print(f"[VoiceForge] Line {line_num} queued: {line_text[:50]}...")
+        return output_file
+    
+    def encode_pcm_segments(self, pcm_lines: List[bytes], segments_dir: Path,
+                            sample_rate: int = 24000) -> List[Path]:
+        """Encode raw PCM for every line into line-N.mp3 with one ffmpeg process.
         
-        meta_file = segments_dir / f"line-{line_num}.json"
-        with open(meta_file, 'w') as f:
-            json.dump(metadata, f, indent=2)
+        For a local TTS that returns s16le mono PCM: the buffers are streamed
+        back-to-back on stdin and the segment muxer splits them at the known
+        line boundaries, so there is one encoder start-up instead of one per line.
+        """
+        segments_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Cut points in seconds from each buffer's length (2 bytes per sample)
+        cut_points = []
+        elapsed = 0
+        for pcm in pcm_lines[:-1]:
+            elapsed += len(pcm) // 2
+            cut_points.append(f"{elapsed / sample_rate:.6f}")
+        
+        cmd = [
+            "ffmpeg", "-y", "-f", "s16le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0",
+            "-f", "segment", "-segment_start_number", "1", "-reset_timestamps", "1",
+            "-codec:a", "libmp3lame", "-q:a", "2",
+        ]
+        if cut_points:
+            cmd += ["-segment_times", ",".join(cut_points)]
+        cmd.append(str(segments_dir / "line-%d.mp3"))
         
-        print(f"[VoiceForge] Line {line_num} metadata created: {line_text[:50]}...")
-        return output_file
+        try:
+            result = subprocess.run(cmd, input=b"".join(pcm_lines), stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.PIPE, timeout=60)
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"[VoiceForge] Error encoding segments: {e}")
+            return []
+        if result.returncode != 0:
+            print(f"[VoiceForge] ffmpeg error: {result.stderr.decode(errors='replace')}")
+            return []
+        
+        return [segments_dir / f"line-{i}.mp3" for i in range(1, len(pcm_lines) + 1)]
     
     def combine_audio_segments(self, segments_dir: Path, output_file: Path) -> bool:
         """Combine individual line audio files into full voiceover.
         
-        Uses ffmpeg to concatenate with minimal gaps.
+        Uses ffmpeg's concat demuxer with stream copy when all segments share
+        the same MP3 format, and only re-encodes through LAME when they differ.
         """
-        # Find all segment files
-        segment_files = sorted(segments_dir.glob("line-*.mp3"))
+        # Segments are line-1..line-8 in script order (no lexical sort: line-10 < line-2)
+        segment_files = [segments_dir / f"line-{i}.mp3" for i in range(1, 9)]
         
-        if len(segment_files) != 8:
-            print(f"[VoiceForge] Warning: Expected 8 segments, found {len(segment_files)}")
+        present = _dir_names(segments_dir)
+        found = sum(seg.name in present for seg in segment_files)
+        if found != len(segment_files):
+            print(f"[VoiceForge] Warning: Expected 8 segments, found {found}")
             return False
         
-        # Create ffmpeg concat file list
+        # Create ffmpeg concat file list (resolve the directory once, not per segment)
         concat_file = segments_dir / "concat.txt"
-        with open(concat_file, 'w') as f:
-            for seg in segment_files:
-                f.write(f"file '{seg.absolute()}'\n")
+        abs_dir = segments_dir.resolve()
+        concat_file.write_text(''.join(f"file '{abs_dir / seg.name}'\n" for seg in segment_files))
+        
+        # Stream copy when formats match; re-encode only as a fallback
+        if _segments_share_format(segment_files):
+            codec_args = ["-c", "copy"]
+        else:
+            print("[VoiceForge] Segment formats differ or could not be probed, re-encoding")
+            codec_args = ["-acodec", "libmp3lame", "-q:a", "2"]
         
         # Run ffmpeg
         try:
+            # Segment format is already known: skip ffmpeg's input seek/probe scan
             cmd = [
                 "ffmpeg", "-y", "-f", "concat", "-safe", "0",
+                "-seekable", "0", "-thread_queue_size", "1024",
+                "-fflags", "+fastseek", "-probesize", "32k", "-analyzeduration", "0",
                 "-i", str(concat_file),
-                "-acodec", "libmp3lame", "-q:a", "2",
+                *codec_args,
                 str(output_file)
             ]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+            # Only the return code matters on success; stderr is read on failure
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=60)
             
             if result.returncode == 0:
                 print(f"[VoiceForge] Combined audio saved: {output_file}")
                 return True
             else:
-                print(f"[VoiceForge] ffmpeg error: {result.stderr}")
+                print(f"[VoiceForge] ffmpeg error: {result.stderr.decode(errors='replace')}")
                 return False
                 
         except FileNotFoundError:
@@ -146,9 +430,13 @@ class VoiceForge:
         segments_dir = output_dir / "segments"
         combined_file = output_dir / "combined.mp3"
         
+        # One readdir per directory instead of a stat per file
+        present = _dir_names(output_dir)
+        segments_present = _dir_names(segments_dir)
+        
         validation = {
-            "segment_count": len(list(segments_dir.glob("line-*.mp3"))),
-            "combined_exists": combined_file.exists(),
+            "segment_count": sum(f"line-{i}.mp3" in segments_present for i in range(1, 9)),
+            "combined_exists": combined_file.name in present,
             "duration_sec": None,
             "pace_wpm": None,
             "passed": False,
@@ -160,12 +448,9 @@ class VoiceForge:
             validation["issues"].append(f"Expected 8 segments, got {validation['segment_count']}")
         
         # Get duration if combined file exists
-        if combined_file.exists():
+        if validation["combined_exists"]:
             try:
-                cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration",
-                       "-of", "default=noprint_wrappers=1:nokey=1", str(combined_file)]
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-                duration = float(result.stdout.strip())
+                duration = _audio_duration(combined_file)
                 validation["duration_sec"] = round(duration, 1)
                 
                 # Calculate pace
@@ -193,7 +478,16 @@ class VoiceForge:
     
     def generate_voiceover(self, date_str: str, script_id: Optional[str] = None) -> Optional[Dict]:
         """Generate complete voiceover for approved script."""
+        return asyncio.run(self._run_then_close(self.generate_voiceover_async(date_str, script_id)))
+    
+    async def generate_voiceover_async(self, date_str: str, script_id: Optional[str] = None) -> Optional[Dict]:
+        """Generate complete voiceover for approved script.
+        
+        Use inside `async with VoiceForge() as forge:` to keep one browser
+        across several scripts.
+        """
         print(f"[VoiceForge] Starting voiceover generation for {date_str}...")
+        self._run_timestamp = utcnow_iso()
         
         # Load approved script
         approved = self.load_approved_script(date_str, script_id)
@@ -212,10 +506,26 @@ class VoiceForge:
         output_dir = self.audio_dir / date_str
         output_dir.mkdir(exist_ok=True)
         
+        segments_dir = output_dir / "segments"
+        segments_dir.mkdir(exist_ok=True)
+        
         # Generate audio for each line
         print(f"[VoiceForge] Generating {len(lines)} audio segments...")
-        for i, line in enumerate(lines, 1):
-            self.generate_line_audio(line, i, output_dir)
+        await self._generate_lines_async(list(enumerate(lines, 1)), output_dir)
+        
+        # Record what each segment needs, in one file for all lines
+        segments_metadata = [
+            {
+                "line_number": i,
+                "text": line,
+                "voice": self.voice_id,
+                "status": "pending",
+                "target_duration_sec": word_count * self._sec_per_word,
+                "created_at": self._run_timestamp
+            }
+            for i, (line, word_count) in enumerate(zip(lines, script['_word_counts']), 1)
+        ]
+        (segments_dir / "metadata.json").write_text(json_dumps(segments_metadata, indent=True), encoding='utf-8')
         
         # Create recording instructions
         self._create_recording_instructions(output_dir, script)
@@ -232,21 +542,21 @@ class VoiceForge:
             }
         
         # Save metadata
+        present = _dir_names(output_dir)
         voiceover_data = {
             "script_id": script.get('seed_id', 'unknown'),
             "voice_id": self.voice_id,
             "tone_applied": script.get('tone', 'serious'),
             "lines": lines,
             "output_dir": str(output_dir),
-            "combined_audio": str(combined_file) if combined_file.exists() else None,
+            "combined_audio": str(combined_file) if combined_file.name in present else None,
             "segment_paths": [str(output_dir / "segments" / f"line-{i}.mp3") for i in range(1, 9)],
             "validation": validation,
-            "created_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+            "created_at": self._run_timestamp
         }
         
         metadata_file = output_dir / "voiceover.json"
-        with open(metadata_file, 'w') as f:
-            json.dump(voiceover_data, f, indent=2)
+        metadata_file.write_text(json_dumps(voiceover_data, indent=True), encoding='utf-8')
         
         print(f"[VoiceForge] Voiceover metadata saved: {metadata_file}")
         
@@ -262,7 +572,7 @@ class VoiceForge:
         """Create human-readable recording instructions."""
         lines = script.get('lines', [])
         
-        instructions = [
+        header = '\n'.join([
             f"# Voiceover Recording Instructions",
             f"",
             f"**Voice:** {self.voice_id}",
@@ -280,18 +590,15 @@ class VoiceForge:
             f"",
             f"## Lines to Record",
             f""
-        ]
+        ])
         
-        for i, line in enumerate(lines, 1):
-            word_count = len(line.split())
-            est_duration = round(word_count / (self.target_pace_wpm / 60), 1)
-            instructions.append(f"### Line {i} (~{est_duration}s)")
-            instructions.append(f"```")
-            instructions.append(line)
-            instructions.append(f"```")
-            instructions.append(f"")
+        word_counts = script.get('_word_counts') or [len(line.split()) for line in lines]
+        body = '\n'.join(
+            f"### Line {i} (~{word_count * self._sec_per_word:.1f}s)\n```\n{line}\n```\n"
+            for i, (line, word_count) in enumerate(zip(lines, word_counts), 1)
+        )
         
-        instructions.extend([
+        footer = '\n'.join([
             f"",
             f"## Quality Checks",
             f"- [ ] Total duration: 40-55 seconds",
@@ -302,13 +609,13 @@ class VoiceForge:
             f"",
             f"## Full Script",
             f"",
-            f"```"
+            f"```",
+            *lines,
+            "```"
         ])
-        instructions.extend(lines)
-        instructions.append("```")
         
         instructions_file = output_dir / "RECORDING.md"
-        instructions_file.write_text('\n'.join(instructions))
+        instructions_file.write_text(f"{header}\n{body}\n{footer}")
         
         print(f"[VoiceForge] Recording instructions: {instructions_file}")
     
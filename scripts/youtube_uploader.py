@@ -9,26 +9,41 @@ Usage:
     python youtube_uploader.py --file video.mp4 --title "My Video" --privacy private
     python youtube_uploader.py --file short.mp4 --title "Short" --shorts --privacy public
     python youtube_uploader.py --file video.mp4 --thumbnail thumb.jpg --title "With Thumb"
+    python youtube_uploader.py --batch uploads.json --concurrency 3
 """
 
 import argparse
+import asyncio
+import functools
 import json
 import logging
 import mimetypes
 import os
 import re
+import struct
+import subprocess
 import sys
-from dataclasses import dataclass, field
-from datetime import datetime, date
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, date, timedelta, timezone
 from pathlib import Path
-from typing import Optional, Callable, Dict, Any, List
+from typing import Optional, Callable, Dict, Any, List, Tuple
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from utils import atomic_write_text, json_dumps, json_loads, utcnow_iso
 
 # Google API imports
 try:
     from googleapiclient.discovery import build
     from googleapiclient.errors import HttpError
     from googleapiclient.http import MediaFileUpload, ResumableMediaUpload
-    from google.auth.transport.requests import Request
+    import google_auth_httplib2
+    import httplib2
+    import requests
+    from google.auth.transport.requests import AuthorizedSession, Request
+    from urllib3.util.retry import Retry
     from google.oauth2.credentials import Credentials
     from google_auth_oauthlib.flow import InstalledAppFlow
     GOOGLE_LIBS_AVAILABLE = True
@@ -39,7 +54,30 @@ except ImportError:
 SCOPES = ['https://www.googleapis.com/auth/youtube.upload']
 API_SERVICE_NAME = 'youtube'
 API_VERSION = 'v3'
+HTTP_TIMEOUT = 60  # seconds per socket operation
 QUOTA_LIMIT = 10000
+QUOTA_FLUSH_INTERVAL = 5.0  # seconds between quota file writes
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+
+# Resumable uploads
+DEFAULT_CHUNKSIZE = 16 * 1024 * 1024
+RETRIABLE_STATUS_CODES = (500, 502, 503, 504)
+MAX_CHUNK_RETRIES = 8
+UPLOAD_URL = 'https://www.googleapis.com/upload/youtube/v3/videos'
+# Query and headers that are the same for every upload session
+_UPLOAD_PARAMS = {'uploadType': 'resumable', 'part': 'snippet,status', 'fields': 'id'}
+_UPLOAD_INIT_HEADERS = {'Content-Type': 'application/json; charset=UTF-8'}
+
+# Google's limit on calls per batch HTTP request
+BATCH_LIMIT = 50
+
+# Common video types, so mimetypes (and its mime.types parse) is rarely needed
+_EXT_MIME = {
+    '.mp4': 'video/mp4',
+    '.mov': 'video/quicktime',
+    '.webm': 'video/webm',
+    '.mkv': 'video/x-matroska',
+}
 
 # Paths
 CREDENTIALS_DIR = Path.home() / '.openclaw' / 'credentials'
@@ -53,6 +91,12 @@ SHORTS_ASPECT_RATIO = 9 / 16  # 0.5625
 SHORTS_WIDTH = 1080
 SHORTS_HEIGHT = 1920
 SHORTS_HASHTAG = '#Shorts'
+# Filename hints that a video is vertical/Shorts ("short" also covers "shorts")
+_SHORTS_RE = re.compile(r'short|vertical|9[x_]16|1080x1920', re.IGNORECASE)
+
+# Privacy statuses, in display order, and the set used for validation
+PRIVACY_STATUSES = ('private', 'unlisted', 'public')
+_VALID_PRIVACY = frozenset(PRIVACY_STATUSES)
 
 # Category IDs
 CATEGORY_PEOPLE_BLOGS = '22'
@@ -66,51 +110,223 @@ logging.basicConfig(
 )
 logger = logging.getLogger('youtube_uploader')
 
+# One keep-alive Http (and requests session) per thread, shared by every uploader
+_http_local = threading.local()
+
+# Credentials already loaded in this process, keyed by (token path, scopes)
+_CRED_CACHE: Dict[Tuple[str, Tuple[str, ...]], Any] = {}
+
+
+def _shared_http() -> Any:
+    """This thread's httplib2.Http; its pooled connections outlive any one uploader."""
+    http = getattr(_http_local, 'http', None)
+    if http is None:
+        http = httplib2.Http(timeout=HTTP_TIMEOUT)
+        _http_local.http = http
+    return http
+
+
+@functools.lru_cache(maxsize=16)
+def _body_template(category_id: str, privacy_status: str, made_for_kids: bool = False) -> Dict[str, Any]:
+    """
+    Shared videos.insert body parts for a category/privacy combination.
+    
+    The returned dicts are reused across uploads, so treat them as read-only.
+    """
+    return {
+        'snippet_base': {'categoryId': category_id},
+        'status': {
+            'privacyStatus': privacy_status,
+            'selfDeclaredMadeForKids': made_for_kids
+        }
+    }
+
+
+def _shared_session(credentials: Any) -> Any:
+    """This thread's pooled AuthorizedSession for credentials, reused across uploaders."""
+    session = getattr(_http_local, 'session', None)
+    if session is None or session.credentials is not credentials:
+        session = AuthorizedSession(credentials)
+        # Retry only failed connects: nothing has been sent, so any request is safe to repeat
+        retry = Retry(total=3, connect=3, read=0, status=0, backoff_factor=0.5)
+        session.mount('https://', requests.adapters.HTTPAdapter(max_retries=retry))
+        _http_local.session = session
+    return session
+
+
+def _expires_soon(credentials: Any) -> bool:
+    """True if credentials expire within TOKEN_REFRESH_MARGIN (google-auth uses naive UTC)."""
+    if credentials.expiry is None:
+        return False
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return credentials.expiry - now < TOKEN_REFRESH_MARGIN
+
+
+def _iter_boxes(f, start: int, end: int):
+    """Yield (type, payload_start, box_end) for the ISO-BMFF boxes in f[start:end]."""
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        size, box_type = struct.unpack('>I4s', f.read(8))
+        header_len = 8
+        if size == 1:
+            size = struct.unpack('>Q', f.read(8))[0]
+            header_len = 16
+        elif size == 0:
+            size = end - pos
+        if size < header_len:
+            return
+        yield box_type, pos + header_len, pos + size
+        pos += size
+
+
+def _mp4_dims(path: str) -> Optional[Tuple[int, int]]:
+    """Read display width/height from the first video track header (moov/trak/tkhd)."""
+    try:
+        with open(path, 'rb') as f:
+            file_end = os.fstat(f.fileno()).st_size
+            for box_type, start, end in _iter_boxes(f, 0, file_end):
+                if box_type != b'moov':
+                    continue
+                for trak_type, trak_start, trak_end in _iter_boxes(f, start, end):
+                    if trak_type != b'trak':
+                        continue
+                    for tkhd_type, tkhd_start, tkhd_end in _iter_boxes(f, trak_start, trak_end):
+                        if tkhd_type != b'tkhd' or tkhd_end - tkhd_start < 84:
+                            continue
+                        # tkhd ends with the 3x3 matrix and 16.16 fixed-point width/height
+                        f.seek(tkhd_end - 44)
+                        a, _, _, _, d = struct.unpack('>5i', f.read(20))
+                        f.seek(tkhd_end - 8)
+                        width, height = (v >> 16 for v in struct.unpack('>II', f.read(8)))
+                        if width and height:
+                            # A 90/270 degree rotation matrix swaps the displayed dimensions
+                            return (height, width) if a == 0 and d == 0 else (width, height)
+                return None
+    except (OSError, struct.error):
+        pass
+    return None
+
+
+def _ffprobe_dims(path: str) -> Optional[Tuple[int, int]]:
+    """Read width/height of the first video stream with ffprobe."""
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-select_streams', 'v:0',
+             '-show_entries', 'stream=width,height', '-of', 'json', path],
+            capture_output=True, text=True, timeout=10
+        )
+        if result.returncode == 0:
+            stream = (json.loads(result.stdout).get('streams') or [{}])[0]
+            width = stream.get('width', 0)
+            height = stream.get('height', 0)
+            if width and height:
+                return width, height
+    except (subprocess.TimeoutExpired, FileNotFoundError, json.JSONDecodeError) as e:
+        logger.debug(f"Could not detect video format: {e}")
+    return None
+
+
+@functools.lru_cache(maxsize=256)
+def _probe_dims(path: str, size: int, mtime: float) -> Optional[Tuple[int, int]]:
+    """
+    Return (width, height) of a video, or None if it can't be determined.
+    
+    size and mtime only key the cache, so an edited file is probed again.
+    MP4/MOV headers are parsed directly; other files go through ffprobe.
+    """
+    return _mp4_dims(path) or _ffprobe_dims(path)
+
 
 @dataclass
 class QuotaTracker:
-    """Tracks YouTube API quota usage."""
+    """Tracks YouTube API quota usage.
+    
+    Usage is written at most every QUOTA_FLUSH_INTERVAL seconds; call
+    flush() (YouTubeUploader's __exit__ does) to persist the remainder.
+    """
     used: int = 0
     limit: int = QUOTA_LIMIT
     date: str = field(default_factory=lambda: date.today().isoformat())
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    _dirty: bool = field(default=False, repr=False, compare=False)
+    _last_flush: float = field(default_factory=time.monotonic, repr=False, compare=False)
     
     @classmethod
     def load(cls) -> 'QuotaTracker':
         """Load quota tracker from file."""
+        today_iso = date.today().isoformat()
         if QUOTA_PATH.exists():
             try:
                 data = json.loads(QUOTA_PATH.read_text())
                 # Reset if it's a new day
-                if data.get('date') != date.today().isoformat():
-                    return cls()
+                if data.get('date') != today_iso:
+                    return cls(date=today_iso)
                 return cls(**data)
             except (json.JSONDecodeError, TypeError) as e:
                 logger.warning(f"Failed to load quota tracker: {e}")
-        return cls()
+        return cls(date=today_iso)
     
     def save(self) -> None:
-        """Save quota tracker to file."""
+        """Save quota tracker to file (atomically, so a crash can't corrupt it)."""
         CREDENTIALS_DIR.mkdir(parents=True, exist_ok=True)
-        QUOTA_PATH.write_text(json.dumps({
+        tmp_path = QUOTA_PATH.with_suffix('.tmp')
+        tmp_path.write_text(json_dumps({
             'used': self.used,
             'limit': self.limit,
             'date': self.date
-        }, indent=2))
+        }))
+        os.replace(tmp_path, QUOTA_PATH)
+        self._dirty = False
+        self._last_flush = time.monotonic()
+    
+    def flush(self) -> None:
+        """Save any usage recorded since the last write."""
+        with self._lock:
+            if self._dirty:
+                self.save()
     
     def check_quota(self, cost: int = 1) -> bool:
         """Check if there's enough quota remaining."""
         return (self.used + cost) <= self.limit
     
     def use_quota(self, cost: int = 1) -> None:
-        """Record quota usage."""
-        self.used += cost
-        self.save()
+        """Record quota usage (safe to call from concurrent uploads)."""
+        with self._lock:
+            self.used += cost
+            self._dirty = True
+            if time.monotonic() - self._last_flush > QUOTA_FLUSH_INTERVAL:
+                self.save()
     
     def remaining(self) -> int:
         """Get remaining quota."""
         return self.limit - self.used
 
 
+class _FileSlice:
+    """File-like view of count bytes of f from offset.
+    
+    requests sends it with a Content-Length from __len__ and streams it
+    through read() in small blocks, so a chunk is never held in memory whole.
+    An mmap of the file would buy nothing here: nothing hashes or re-reads it.
+    """
+    
+    def __init__(self, f, offset: int, count: int):
+        f.seek(offset)
+        self._f = f
+        self._remaining = count
+    
+    def __len__(self) -> int:
+        return self._remaining
+    
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._f.read(size)
+        self._remaining -= len(data)
+        return data
+
+
 @dataclass
 class UploadResult:
     """Result of a video upload."""
@@ -126,11 +342,15 @@ class UploadResult:
 class YouTubeUploader:
     """YouTube video uploader with OAuth 2.0 and quota management."""
     
-    def __init__(self, mock_mode: bool = False):
+    def __init__(self, mock_mode: bool = False, chunksize: int = DEFAULT_CHUNKSIZE,
+                 raw_upload: bool = False):
         self.mock_mode = mock_mode or not GOOGLE_LIBS_AVAILABLE
+        self.chunksize = chunksize
+        self.raw_upload = raw_upload
         self.credentials: Optional[Credentials] = None
         self.service: Optional[Any] = None
         self.quota = QuotaTracker.load()
+        self._local = threading.local()
         
         if not self.mock_mode:
             self._authenticate()
@@ -139,8 +359,7 @@ class YouTubeUploader:
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        # Clean up if needed
-        pass
+        self.quota.flush()
     
     def _authenticate(self) -> None:
         """Authenticate with YouTube API using OAuth 2.0."""
@@ -150,18 +369,36 @@ class YouTubeUploader:
             self.mock_mode = True
             return
         
-        # Load existing token
+        # Reuse credentials loaded earlier in this process while they stay fresh
+        cache_key = (str(TOKEN_PATH), tuple(SCOPES))
+        cached = _CRED_CACHE.get(cache_key)
+        if cached and cached.valid and not _expires_soon(cached):
+            self.credentials = cached
+        else:
+            self._load_credentials()
+            _CRED_CACHE[cache_key] = self.credentials
+        
+        # Build YouTube service; this thread keeps using the service's connection
+        http = self._new_http()
+        self._local.http = http
+        self.service = build(API_SERVICE_NAME, API_VERSION, http=http)
+        logger.info("Successfully authenticated with YouTube API")
+    
+    def _load_credentials(self) -> None:
+        """Load the saved token, refreshing it or running the OAuth flow as needed."""
+        saved_json = None
         if TOKEN_PATH.exists():
             try:
-                self.credentials = Credentials.from_authorized_user_file(
-                    str(TOKEN_PATH), SCOPES
+                saved_json = TOKEN_PATH.read_text()
+                self.credentials = Credentials.from_authorized_user_info(
+                    json.loads(saved_json), SCOPES
                 )
             except Exception as e:
                 logger.warning(f"Failed to load credentials: {e}")
         
-        # Refresh or create new credentials
-        if not self.credentials or not self.credentials.valid:
-            if self.credentials and self.credentials.expired and self.credentials.refresh_token:
+        # Refresh or create new credentials (refresh early rather than mid-upload)
+        if not self.credentials or not self.credentials.valid or _expires_soon(self.credentials):
+            if self.credentials and self.credentials.refresh_token:
                 logger.info("Refreshing access token...")
                 self.credentials.refresh(Request())
             else:
@@ -170,44 +407,46 @@ class YouTubeUploader:
                     str(CLIENT_SECRETS_PATH), SCOPES
                 )
                 self.credentials = flow.run_local_server(port=0)
-            
-            # Save token for future runs
+        
+        # Save token for future runs, only when it changed
+        token_json = self.credentials.to_json()
+        if token_json != saved_json:
             CREDENTIALS_DIR.mkdir(parents=True, exist_ok=True)
-            TOKEN_PATH.write_text(self.credentials.to_json())
+            # Owner-only and atomic: it holds the refresh token, and a torn
+            # write would break every later run
+            atomic_write_text(TOKEN_PATH, token_json, mode=0o600)
             logger.info(f"Token saved to {TOKEN_PATH}")
-        
-        # Build YouTube service
-        self.service = build(API_SERVICE_NAME, API_VERSION, credentials=self.credentials)
-        logger.info("Successfully authenticated with YouTube API")
     
-    def _detect_shorts_format(self, file_path: Path) -> bool:
+    def _new_http(self) -> Any:
+        """Authorized view of this thread's shared keep-alive Http."""
+        return google_auth_httplib2.AuthorizedHttp(self.credentials, http=_shared_http())
+    
+    def _thread_http(self) -> Any:
+        """Authorized Http for the calling thread (httplib2.Http is not thread-safe)."""
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = self._new_http()
+            self._local.http = http
+        return http
+    
+    def _detect_shorts_format(self, file_path: Path, st: Optional[os.stat_result] = None) -> bool:
         """Detect if video is in Shorts format (9:16 aspect ratio)."""
         try:
-            # Try to use ffprobe if available
-            import subprocess
-            result = subprocess.run(
-                ['ffprobe', '-v', 'error', '-select_streams', 'v:0',
-                 '-show_entries', 'stream=width,height', '-of', 'json', str(file_path)],
-                capture_output=True, text=True, timeout=10
-            )
-            if result.returncode == 0:
-                data = json.loads(result.stdout)
-                stream = data.get('streams', [{}])[0]
-                width = stream.get('width', 0)
-                height = stream.get('height', 0)
-                if width and height:
-                    ratio = width / height
-                    # Check if close to 9:16 (0.5625)
-                    is_shorts = abs(ratio - SHORTS_ASPECT_RATIO) < 0.05
-                    logger.debug(f"Video dimensions: {width}x{height}, ratio: {ratio:.4f}, shorts: {is_shorts}")
-                    return is_shorts
-        except (subprocess.TimeoutExpired, FileNotFoundError, json.JSONDecodeError) as e:
+            st = st or file_path.stat()
+            dims = _probe_dims(str(file_path), st.st_size, st.st_mtime)
+        except OSError as e:
             logger.debug(f"Could not detect video format: {e}")
+            dims = None
+        
+        if dims:
+            width, height = dims
+            # Within 0.05 of 9:16 (0.5125 < width/height < 0.6125), in integers
+            is_shorts = 2050 * height < 4000 * width < 2450 * height
+            logger.debug(f"Video dimensions: {width}x{height}, shorts: {is_shorts}")
+            return is_shorts
         
         # Fallback: check filename for shorts indicators
-        filename_lower = file_path.name.lower()
-        shorts_indicators = ['short', 'shorts', 'vertical', '9x16', '9_16', '1080x1920']
-        return any(ind in filename_lower for ind in shorts_indicators)
+        return bool(_SHORTS_RE.search(file_path.name))
     
     def _optimize_for_shorts(
         self, title: str, description: str, tags: List[str], category_id: str
@@ -227,19 +466,17 @@ class YouTubeUploader:
         
         return title, description, tags, category_id
     
-    def _save_upload_record(self, result: UploadResult, metadata: Dict[str, Any]) -> None:
-        """Save upload record to JSON file."""
-        UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
+    def _save_upload_record(
+        self, result: UploadResult, metadata: Dict[str, Any], today_iso: Optional[str] = None
+    ) -> None:
+        """Append upload record to the day's JSON Lines file (today_iso defaults to today).
         
-        record_file = UPLOADS_DIR / f"{date.today().isoformat()}.json"
+        Read a day's records back with utils.load_records(UPLOADS_DIR / f"{today_iso}.jsonl").
+        """
+        UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
         
-        # Load existing records
-        records = []
-        if record_file.exists():
-            try:
-                records = json.loads(record_file.read_text())
-            except json.JSONDecodeError:
-                records = []
+        today_iso = today_iso or date.today().isoformat()
+        record_file = UPLOADS_DIR / f"{today_iso}.jsonl"
         
         # Add new record
         record = {
@@ -252,10 +489,10 @@ class YouTubeUploader:
             'mock': result.mock,
             'metadata': metadata
         }
-        records.append(record)
         
-        # Save back
-        record_file.write_text(json.dumps(records, indent=2))
+        # One O_APPEND write per record: no rewrite, safe across concurrent uploads
+        with open(record_file, 'a', encoding='utf-8') as f:
+            f.write(json_dumps(record) + '\n')
         logger.info(f"Upload record saved to {record_file}")
     
     def upload_video(
@@ -266,8 +503,9 @@ class YouTubeUploader:
         tags: Optional[List[str]] = None,
         category_id: str = "",
         privacy_status: str = "private",
-        shorts: bool = False,
-        progress_callback: Optional[Callable[[int], None]] = None
+        shorts: Optional[bool] = None,
+        progress_callback: Optional[Callable[[int], None]] = None,
+        today_iso: Optional[str] = None
     ) -> UploadResult:
         """
         Upload a video to YouTube.
@@ -279,8 +517,10 @@ class YouTubeUploader:
             tags: List of tags
             category_id: YouTube category ID
             privacy_status: private, unlisted, or public
-            shorts: Force Shorts optimization
+            shorts: True forces Shorts optimization, False skips it without
+                probing the file, None (default) detects from the video
             progress_callback: Optional callback for upload progress (0-100)
+            today_iso: Date of the record file to log to (default: today)
         
         Returns:
             UploadResult with video details
@@ -290,18 +530,23 @@ class YouTubeUploader:
             RuntimeError: If quota exceeded or upload fails
         """
         # Validate inputs
-        valid_privacy = ['private', 'unlisted', 'public']
-        if privacy_status not in valid_privacy:
-            raise ValueError(f"privacy_status must be one of {valid_privacy}")
+        if privacy_status not in _VALID_PRIVACY:
+            raise ValueError(f"privacy_status must be one of {list(PRIVACY_STATUSES)}")
         
         file_path_obj = Path(file_path)
-        if not file_path_obj.exists():
+        try:
+            st = file_path_obj.stat()
+        except FileNotFoundError:
             raise FileNotFoundError(f"Video file not found: {file_path}")
         
-        tags = tags or []
+        # Drop repeated tags but keep their order; YouTube weights earlier tags more
+        tags = list(dict.fromkeys(tags or ()))
         
         # Check for Shorts format
-        is_shorts = shorts or self._detect_shorts_format(file_path_obj)
+        if shorts is None:
+            is_shorts = self._detect_shorts_format(file_path_obj, st)
+        else:
+            is_shorts = shorts
         if is_shorts:
             title, description, tags, category_id = self._optimize_for_shorts(
                 title, description, tags, category_id
@@ -324,11 +569,11 @@ class YouTubeUploader:
             logger.info(f"  Privacy: {privacy_status}")
             logger.info(f"  Shorts: {is_shorts}")
             
-            mock_id = f"mock_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            mock_id = f"mock_{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
             result = UploadResult(
                 video_id=mock_id,
                 url=f"https://youtube.com/watch?v={mock_id}",
-                upload_timestamp=datetime.now().isoformat(),
+                upload_timestamp=utcnow_iso(),
                 title=title,
                 privacy_status=privacy_status,
                 shorts_optimized=is_shorts,
@@ -340,55 +585,41 @@ class YouTubeUploader:
                 'description': description,
                 'tags': tags,
                 'category_id': category_id
-            })
+            }, today_iso)
             
             return result
         
         # Real upload
+        tmpl = _body_template(category_id or CATEGORY_ENTERTAINMENT, privacy_status)
         body = {
             'snippet': {
+                **tmpl['snippet_base'],
                 'title': title,
                 'description': description,
-                'tags': tags,
-                'categoryId': category_id or CATEGORY_ENTERTAINMENT
+                'tags': tags
             },
-            'status': {
-                'privacyStatus': privacy_status,
-                'selfDeclaredMadeForKids': False
-            }
+            'status': tmpl['status']
         }
         
         # Determine media type
-        media_type, _ = mimetypes.guess_type(str(file_path_obj))
-        if not media_type:
-            media_type = 'video/mp4'
-        
-        media = MediaFileUpload(
-            str(file_path_obj),
-            mimetype=media_type,
-            resumable=True
-        )
+        media_type = (_EXT_MIME.get(file_path_obj.suffix.lower())
+                      or mimetypes.guess_type(str(file_path_obj))[0]
+                      or 'video/mp4')
         
         try:
             logger.info(f"Starting upload: {title}")
-            request = self.service.videos().insert(
-                part=','.join(body.keys()),
-                body=body,
-                media_body=media
-            )
-            
-            # Execute upload with progress tracking
-            response = None
-            while response is None:
-                status, response = request.next_chunk()
-                if status and progress_callback:
-                    progress_callback(int(status.progress() * 100))
+            if self.raw_upload:
+                response = self._resumable_upload_raw(
+                    body, file_path_obj, st.st_size, media_type, progress_callback
+                )
+            else:
+                response = self._upload_with_client(body, file_path_obj, media_type, progress_callback)
             
             video_id = response['id']
             result = UploadResult(
                 video_id=video_id,
                 url=f"https://youtube.com/watch?v={video_id}",
-                upload_timestamp=datetime.now().isoformat(),
+                upload_timestamp=utcnow_iso(),
                 title=title,
                 privacy_status=privacy_status,
                 shorts_optimized=is_shorts,
@@ -401,7 +632,7 @@ class YouTubeUploader:
             logger.info(f"Quota used: {self.quota.used}/{self.quota.limit}")
             
             # Save record
-            self._save_upload_record(result, body)
+            self._save_upload_record(result, body, today_iso)
             
             return result
             
@@ -411,6 +642,174 @@ class YouTubeUploader:
                     f"YouTube API quota exceeded. Used: {self.quota.used}/{self.quota.limit}"
                 )
             raise RuntimeError(f"Upload failed: {e}")
+        except requests.RequestException as e:
+            response = getattr(e, 'response', None)
+            if response is not None and response.status_code == 403 and 'quotaExceeded' in response.text:
+                raise RuntimeError(
+                    f"YouTube API quota exceeded. Used: {self.quota.used}/{self.quota.limit}"
+                )
+            raise RuntimeError(f"Upload failed: {e}")
+    
+    def _upload_with_client(
+        self,
+        body: Dict[str, Any],
+        file_path: Path,
+        media_type: str,
+        progress_callback: Optional[Callable[[int], None]] = None
+    ) -> Dict[str, Any]:
+        """Run a resumable videos.insert through googleapiclient; returns the response."""
+        media = MediaFileUpload(
+            str(file_path),
+            mimetype=media_type,
+            resumable=True,
+            chunksize=self.chunksize
+        )
+        request = self.service.videos().insert(
+            part='snippet,status',
+            body=body,
+            media_body=media,
+            fields='id'
+        )
+        
+        # Execute upload with progress tracking on this thread's connection
+        http = self._thread_http()
+        response = None
+        retries = 0
+        while response is None:
+            try:
+                status, response = request.next_chunk(http=http)
+            except HttpError as e:
+                # Transient server errors: back off and resume from the last chunk
+                if e.resp.status not in RETRIABLE_STATUS_CODES or retries >= MAX_CHUNK_RETRIES:
+                    raise
+                retries += 1
+                delay = min(2 ** retries, 64)
+                logger.warning(f"Chunk upload failed with HTTP {e.resp.status}, retrying in {delay}s")
+                time.sleep(delay)
+                continue
+            retries = 0
+            if status and progress_callback:
+                progress_callback(int(status.progress() * 100))
+        return response
+    
+    def _resumable_upload_raw(
+        self,
+        body: Dict[str, Any],
+        file_path: Path,
+        file_size: int,
+        media_type: str,
+        progress_callback: Optional[Callable[[int], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Upload a video with the resumable protocol directly over requests.
+        
+        Opens an upload session, then PUTs chunksize-byte ranges on this
+        thread's pooled session, following 308 Range replies. Transient 5xx
+        errors back off, ask the server how much it has, and resume there.
+        
+        Returns:
+            The inserted video resource (id only)
+        
+        Raises:
+            requests.HTTPError: On a non-retriable error response
+        """
+        session = _shared_session(self.credentials)
+        response = session.post(
+            UPLOAD_URL,
+            params=_UPLOAD_PARAMS,
+            data=json_dumps(body).encode('utf-8'),
+            headers={
+                **_UPLOAD_INIT_HEADERS,
+                'X-Upload-Content-Type': media_type,
+                'X-Upload-Content-Length': str(file_size)
+            },
+            timeout=HTTP_TIMEOUT
+        )
+        response.raise_for_status()
+        session_uri = response.headers['Location']
+        
+        offset = 0
+        retries = 0
+        query_status = False
+        with open(file_path, 'rb') as f:
+            # The file is sent front to back once: let the kernel read ahead aggressively
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            while True:
+                if query_status:
+                    # Empty PUT: the server replies with how many bytes it has
+                    headers = {'Content-Range': f'bytes */{file_size}'}
+                    response = session.put(session_uri, headers=headers, timeout=HTTP_TIMEOUT)
+                else:
+                    # Stream the range from disk instead of reading the chunk into memory.
+                    # (sendfile(2) wouldn't avoid the copy: uploads are TLS, and ssl
+                    # sockets fall back to send() for socket.sendfile.)
+                    count = min(self.chunksize, file_size - offset)
+                    headers = {'Content-Range': f'bytes {offset}-{offset + count - 1}/{file_size}'}
+                    response = session.put(session_uri, data=_FileSlice(f, offset, count),
+                                           headers=headers, timeout=HTTP_TIMEOUT)
+                
+                if response.status_code in (200, 201):
+                    if progress_callback:
+                        progress_callback(100)
+                    return json_loads(response.content)
+                
+                if response.status_code == 308:
+                    # Range: bytes=0-N means the next byte to send is N + 1
+                    received = response.headers.get('Range')
+                    offset = int(received.rsplit('-', 1)[1]) + 1 if received else 0
+                    query_status = False
+                    retries = 0
+                    if progress_callback:
+                        progress_callback(int(offset * 100 / file_size))
+                    continue
+                
+                if response.status_code in RETRIABLE_STATUS_CODES and retries < MAX_CHUNK_RETRIES:
+                    retries += 1
+                    delay = min(2 ** retries, 64)
+                    logger.warning(f"Chunk upload failed with HTTP {response.status_code}, retrying in {delay}s")
+                    time.sleep(delay)
+                    query_status = True
+                    continue
+                
+                response.raise_for_status()
+                raise RuntimeError(f"Unexpected upload response: HTTP {response.status_code}")
+    
+    async def upload_videos(self, entries: List[Dict[str, Any]], concurrency: int = 2) -> List[Any]:
+        """
+        Upload several videos concurrently.
+        
+        Args:
+            entries: One dict of upload_video keyword arguments per video
+            concurrency: Maximum number of uploads in flight at once
+        
+        Returns:
+            One item per entry, in order: its UploadResult, or the exception
+            that upload raised
+        """
+        await self._probe_entries(entries)
+        semaphore = asyncio.Semaphore(concurrency)
+        # The whole batch is recorded under the day it started
+        today_iso = date.today().isoformat()
+        
+        async def _one(entry: Dict[str, Any]) -> UploadResult:
+            async with semaphore:
+                return await asyncio.to_thread(self.upload_video, **{'today_iso': today_iso, **entry})
+        
+        return await asyncio.gather(*[_one(e) for e in entries], return_exceptions=True)
+    
+    async def _probe_entries(self, entries: List[Dict[str, Any]]) -> None:
+        """Probe all batch files in parallel up front so uploads hit the _probe_dims cache."""
+        semaphore = asyncio.Semaphore(os.cpu_count() or 4)
+        
+        async def _probe(entry: Dict[str, Any]) -> None:
+            if entry.get('shorts') is not None:
+                return
+            async with semaphore:
+                await asyncio.to_thread(self._detect_shorts_format, Path(entry['file_path']))
+        
+        # Failures surface later from upload_video itself
+        await asyncio.gather(*[_probe(e) for e in entries], return_exceptions=True)
     
     def upload_thumbnail(self, video_id: str, thumbnail_path: str) -> bool:
         """
@@ -428,11 +827,12 @@ class YouTubeUploader:
             RuntimeError: If upload fails or quota exceeded
         """
         thumbnail_path_obj = Path(thumbnail_path)
-        if not thumbnail_path_obj.exists():
+        try:
+            file_size = thumbnail_path_obj.stat().st_size
+        except FileNotFoundError:
             raise FileNotFoundError(f"Thumbnail not found: {thumbnail_path}")
         
         # Check file size (max 2MB)
-        file_size = thumbnail_path_obj.stat().st_size
         if file_size > 2 * 1024 * 1024:
             raise ValueError(f"Thumbnail too large: {file_size} bytes (max 2MB)")
         
@@ -449,8 +849,9 @@ class YouTubeUploader:
             media = MediaFileUpload(str(thumbnail_path_obj))
             self.service.thumbnails().set(
                 videoId=video_id,
-                media_body=media
-            ).execute()
+                media_body=media,
+                fields='items/default/url'
+            ).execute(http=self._thread_http())
             
             self.quota.use_quota(quota_cost)
             logger.info(f"Thumbnail uploaded for {video_id}")
@@ -470,9 +871,8 @@ class YouTubeUploader:
         Returns:
             True if successful
         """
-        valid_privacy = ['private', 'unlisted', 'public']
-        if privacy_status not in valid_privacy:
-            raise ValueError(f"privacy_status must be one of {valid_privacy}")
+        if privacy_status not in _VALID_PRIVACY:
+            raise ValueError(f"privacy_status must be one of {list(PRIVACY_STATUSES)}")
         
         quota_cost = 50
         if not self.quota.check_quota(quota_cost):
@@ -490,8 +890,9 @@ class YouTubeUploader:
                     'status': {
                         'privacyStatus': privacy_status
                     }
-                }
-            ).execute()
+                },
+                fields='id,status/privacyStatus'
+            ).execute(http=self._thread_http())
             
             self.quota.use_quota(quota_cost)
             logger.info(f"Updated {video_id} privacy to {privacy_status}")
@@ -499,6 +900,64 @@ class YouTubeUploader:
             
         except HttpError as e:
             raise RuntimeError(f"Privacy update failed: {e}")
+    
+    def update_privacy_batch(self, privacy_by_video: Dict[str, str]) -> Dict[str, bool]:
+        """
+        Update privacy status of several videos, BATCH_LIMIT per HTTP request.
+        
+        Thumbnails can't join these batches: the API rejects media uploads
+        inside batch requests, so upload_thumbnail stays one call per video.
+        
+        Args:
+            privacy_by_video: Mapping of video ID to private, unlisted, or public
+        
+        Returns:
+            Mapping of video ID to whether its update succeeded
+        """
+        for privacy_status in privacy_by_video.values():
+            if privacy_status not in _VALID_PRIVACY:
+                raise ValueError(f"privacy_status must be one of {list(PRIVACY_STATUSES)}")
+        
+        quota_cost = 50
+        if not self.quota.check_quota(quota_cost * len(privacy_by_video)):
+            raise RuntimeError(f"Quota exceeded. Remaining: {self.quota.remaining()}")
+        
+        if self.mock_mode:
+            for video_id, privacy_status in privacy_by_video.items():
+                logger.info(f"[MOCK MODE] Would update {video_id} privacy to {privacy_status}")
+            return {video_id: True for video_id in privacy_by_video}
+        
+        results = {}
+        
+        def _on_response(video_id: str, response: Any, exception: Optional[Exception]) -> None:
+            if exception is not None:
+                logger.error(f"Privacy update failed for {video_id}: {exception}")
+                results[video_id] = False
+                return
+            self.quota.use_quota(quota_cost)
+            logger.info(f"Updated {video_id} privacy to {privacy_by_video[video_id]}")
+            results[video_id] = True
+        
+        items = list(privacy_by_video.items())
+        try:
+            for start in range(0, len(items), BATCH_LIMIT):
+                batch = self.service.new_batch_http_request(callback=_on_response)
+                for video_id, privacy_status in items[start:start + BATCH_LIMIT]:
+                    batch.add(self.service.videos().update(
+                        part='status',
+                        body={
+                            'id': video_id,
+                            'status': {
+                                'privacyStatus': privacy_status
+                            }
+                        },
+                        fields='id,status/privacyStatus'
+                    ), request_id=video_id)
+                batch.execute(http=self._thread_http())
+        except HttpError as e:
+            raise RuntimeError(f"Batch privacy update failed: {e}")
+        
+        return results
 
 
 def main():
@@ -511,34 +970,69 @@ Examples:
   %(prog)s --file video.mp4 --title "My Video" --privacy private
   %(prog)s --file short.mp4 --title "Short Title" --shorts --privacy public
   %(prog)s --file video.mp4 --thumbnail thumb.jpg --title "With Thumbnail"
+  %(prog)s --batch uploads.json --concurrency 3
+  %(prog)s --set-privacy abc123=public def456=unlisted
+
+A --batch file is a JSON list of objects holding upload_video arguments,
+e.g. [{"file_path": "a.mp4", "title": "A", "privacy_status": "unlisted"}].
         """
     )
     
-    parser.add_argument('--file', '-f', required=True, help='Video file path')
-    parser.add_argument('--title', '-t', required=True, help='Video title')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--file', '-f', help='Video file path')
+    source.add_argument('--batch', help='JSON file listing several uploads')
+    source.add_argument('--set-privacy', nargs='+', metavar='VIDEO_ID=STATUS',
+                        help='Change the privacy of uploaded videos in batched requests')
+    parser.add_argument('--concurrency', type=int, default=2,
+                        help='Parallel uploads for --batch (default: 2)')
+    parser.add_argument('--title', '-t', help='Video title (required with --file)')
     parser.add_argument('--description', '-d', default='', help='Video description')
     parser.add_argument('--tags', help='Comma-separated tags')
     parser.add_argument('--category', '-c', help='Category ID (default: 22 for Shorts, 24 otherwise)')
     parser.add_argument('--privacy', '-p', default='private',
-                        choices=['private', 'unlisted', 'public'],
+                        choices=PRIVACY_STATUSES,
                         help='Privacy status (default: private)')
-    parser.add_argument('--shorts', '-s', action='store_true',
+    parser.add_argument('--shorts', '-s', action='store_true', default=None,
                         help='Force Shorts optimization')
+    parser.add_argument('--no-shorts', action='store_false', dest='shorts',
+                        help='Never apply Shorts optimization (skips format detection)')
     parser.add_argument('--thumbnail', help='Thumbnail image path')
+    parser.add_argument('--chunksize-mb', type=int, default=DEFAULT_CHUNKSIZE // (1024 * 1024),
+                        help='Resumable upload chunk size in MiB (default: 16)')
+    parser.add_argument('--raw-upload', action='store_true',
+                        help='Send upload chunks directly over requests instead of googleapiclient')
     parser.add_argument('--mock', action='store_true',
                         help='Run in mock mode (no actual upload)')
     parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
     
     args = parser.parse_args()
+    if args.file and not args.title:
+        parser.error('--title is required with --file')
     
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
     
+    if args.batch:
+        _run_batch(args)
+        return
+    
+    if args.set_privacy:
+        privacy_by_video = {}
+        for item in args.set_privacy:
+            video_id, _, privacy_status = item.partition('=')
+            if not video_id or privacy_status not in _VALID_PRIVACY:
+                parser.error(f"--set-privacy expects VIDEO_ID=STATUS with STATUS one of "
+                             f"{', '.join(PRIVACY_STATUSES)}, got {item!r}")
+            privacy_by_video[video_id] = privacy_status
+        _run_set_privacy(args, privacy_by_video)
+        return
+    
     # Parse tags
     tags = [t.strip() for t in args.tags.split(',')] if args.tags else []
     
     try:
-        with YouTubeUploader(mock_mode=args.mock) as uploader:
+        with YouTubeUploader(mock_mode=args.mock, chunksize=args.chunksize_mb * 1024 * 1024,
+                             raw_upload=args.raw_upload) as uploader:
             # Upload video
             result = uploader.upload_video(
                 file_path=args.file,
@@ -585,5 +1079,48 @@ Examples:
         sys.exit(1)
 
 
+def _run_batch(args: argparse.Namespace) -> None:
+    """Upload every entry of args.batch and print one JSON list of outcomes."""
+    try:
+        entries = json.loads(Path(args.batch).read_text())
+        with YouTubeUploader(mock_mode=args.mock, chunksize=args.chunksize_mb * 1024 * 1024,
+                             raw_upload=args.raw_upload) as uploader:
+            results = asyncio.run(uploader.upload_videos(entries, concurrency=args.concurrency))
+    except Exception as e:
+        logger.error(f"Batch upload failed: {e}")
+        sys.exit(1)
+    
+    output = []
+    failed = 0
+    for entry, result in zip(entries, results):
+        if isinstance(result, Exception):
+            logger.error(f"Upload failed for {entry.get('file_path')}: {result}")
+            output.append({'file_path': entry.get('file_path'), 'error': str(result)})
+            failed += 1
+        else:
+            output.append(asdict(result))
+    
+    logger.info(f"Batch complete: {len(entries) - failed}/{len(entries)} uploaded, "
+                f"quota {uploader.quota.used}/{uploader.quota.limit}")
+    print(json.dumps(output))
+    if failed:
+        sys.exit(1)
+
+
+
+def _run_set_privacy(args: argparse.Namespace, privacy_by_video: Dict[str, str]) -> None:
+    """Apply --set-privacy and print one JSON object of per-video outcomes."""
+    try:
+        with YouTubeUploader(mock_mode=args.mock) as uploader:
+            results = uploader.update_privacy_batch(privacy_by_video)
+    except Exception as e:
+        logger.error(f"Privacy update failed: {e}")
+        sys.exit(1)
+    
+    print(json.dumps(results))
+    if not all(results.get(video_id) for video_id in privacy_by_video):
+        sys.exit(1)
+
+
 if __name__ == '__main__':
     main()